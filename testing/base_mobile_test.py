@@ -1,51 +1,355 @@
 """
 Base class for mobile tests with common functionality including dynamic map loading.
 """
+import functools
+import re
 import time
-from selenium.webdriver.common.action_chains import ActionChains
+from itertools import islice
+from time import monotonic_ns
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    TimeoutException, ElementClickInterceptedException, WebDriverException,
+    StaleElementReferenceException, JavascriptException
+)
+from config import TestConfig
 from map_load_detector import MapLoadDetector
 
+# Most activities listed from the side panel text, to avoid spam
+_MAX_LISTED_ACTIVITIES = 10
+
+# Patterns for the side panel text-parsing fallback, compiled once at import.
+# The date patterns capture the whole date so split() keeps it in the result
+_WS_RE = re.compile(r'\s+')
+_DATE_PATTERNS = [
+    re.compile(r'(\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2} [AP]M)'),  # MM/DD/YYYY HH:MM:SS AM/PM
+    re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})'),  # ISO format
+    re.compile(r'(\d{1,2}/\d{1,2}/\d{4})'),  # MM/DD/YYYY
+]
+_ACTIVITY_SPLIT_RE = re.compile(r'🏃|🚴|🏊')
+_LEADING_RUNNER_RE = re.compile(r'^\s*🏃\s*')
+_DATE_RE = re.compile(r'\d{1,2}/\d{1,2}/\d{4}(?:\s+\d{1,2}:\d{2}:\d{2}\s*[AP]M)?')
+_DISTANCE_RE = re.compile(r'📏\s*[\d.]+\s*mi')
+_TIME_RE = re.compile(r'⏱️\s*\d+:\d+')
+
+# Ordered fallback CSS selectors for frequently used controls, most specific
+# first (id, then title/structure), so a renamed id doesn't break every test
+_ELEMENT_PATTERNS = {
+    'lasso_button': ('#lasso-btn', '[title="Select Area"]'),
+    'upload_button': ('#upload-btn', '[title="Upload GPX"]'),
+    'extras_button': ('#extras-btn', '[title="More"]'),
+    'clear_uploads_button': ('#clear-uploads-btn',),
+    'deselect_all': ('#deselect-all', '.panel-controls .control-link:last-child'),
+    'panel_collapse': ('#panel-collapse', '#side-panel .panel-collapse'),
+    'panel_expand': ('#expand-btn', '#side-panel .expand-btn'),
+    'panel_close': ('#panel-close', '#side-panel .panel-close'),
+}
+
+# Returns the first selector in arguments[0] that matches an element, or null
+_FIRST_PRESENT_SELECTOR_JS = """
+    return arguments[0].find(selector => document.querySelector(selector) !== null) || null;
+"""
+
+# Context name markers for the app's WebView and the system webview_shell,
+# which can expose its own WebView context and interfere with the switch
+_APP_WEBVIEW = 'WEBVIEW_com.run.heatmap'
+_WEBVIEW_SHELL = 'webview_shell'
+
+
+def _pick_webview_context(contexts):
+    """
+    Pick the app's WebView from a contexts list in a single pass, falling back
+    to the first other WebView that isn't webview_shell. Returns None if neither exists.
+    """
+    fallback = None
+    for context in contexts:
+        if _APP_WEBVIEW in context:
+            return context
+        if fallback is None and 'WEBVIEW' in context and _WEBVIEW_SHELL not in context:
+            fallback = context
+    return fallback
+
+# Resolves true once the WebView document is complete, false after 5s
+_WAIT_FOR_DOCUMENT_READY_JS = """
+    const done = arguments[arguments.length - 1];
+    if (document.readyState === 'complete') return done(true);
+    document.addEventListener('readystatechange', () => {
+        if (document.readyState === 'complete') done(true);
+    });
+    setTimeout(() => done(false), 5000);
+"""
+
+# Appium execute_driver (WebdriverIO) script: find the app's WebView, preferring
+# it over other WebViews such as webview_shell, and switch to it server-side
+_SWITCH_TO_WEBVIEW_DRIVER_SCRIPT = """
+    const contexts = await driver.getContexts();
+    const target = contexts.find(c => c.includes('WEBVIEW_com.run.heatmap')) ||
+        contexts.find(c => c.includes('WEBVIEW') && !c.includes('webview_shell'));
+    if (!target) return null;
+    await driver.switchContext(target);
+    return target;
+"""
+
+# Side panel visibility, run count and pre-split activities (check_side_panel)
+_SIDE_PANEL_JS = """
+    const panel = document.getElementById('side-panel');
+    const panelContent = document.getElementById('panel-content');
+    
+    if (!panel) return { visible: false, error: 'No side panel element' };
+    
+    // A laid-out panel has an offsetParent; only fall back to computed style
+    // (which can force a style recalc) when it doesn't, e.g. position: fixed
+    let styles = null;
+    let isVisible = panel.offsetParent !== null;
+    if (!isVisible) {
+        styles = window.getComputedStyle(panel);
+        isVisible = styles.display !== 'none' && styles.visibility !== 'hidden';
+    }
+    
+    // Activity details and the text preview are only needed for printing
+    const verbose = !!(arguments[0] && arguments[0].verbose);
+    
+    let runCount = 0;
+    let hasContent = false;
+    let allText = '';
+    const activities = [];
+    let cardTexts = null;
+    
+    if (panelContent) {
+        // Single TreeWalker pass over the panel: count activity card
+        // containers on element nodes and distance/time pairs (📏 + ⏱️)
+        // incrementally on text nodes
+        const cardSelector = '.activity-card, .run-item, [data-activity], [data-run-id]';
+        const datePattern = /\\d{1,2}\\/\\d{1,2}\\/\\d{4}/g;
+        const uniqueDates = new Set();
+        const textParts = [];
+        const activityCards = [];
+        let distanceTimeCount = 0;
+        let pendingDistance = false;
+        
+        const walker = document.createTreeWalker(
+            panelContent, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT
+        );
+        while (walker.nextNode()) {
+            const node = walker.currentNode;
+            if (node.nodeType === Node.ELEMENT_NODE) {
+                if (node.matches(cardSelector)) activityCards.push(node);
+                continue;
+            }
+            
+            const text = node.nodeValue;
+            textParts.push(text);
+            
+            // Each ⏱️ that follows a 📏 closes one distance/time pair
+            for (const ch of text) {
+                if (ch === '📏') {
+                    pendingDistance = true;
+                } else if (ch === '⏱' && pendingDistance) {
+                    distanceTimeCount++;
+                    pendingDistance = false;
+                }
+            }
+        }
+        
+        allText = textParts.join('').trim();
+        hasContent = allText.length > 10;
+        
+        // Dates are matched against the joined text, not node by node, so a
+        // date split across inline elements still counts. The exec() loop
+        // resets lastIndex to 0 when it runs out of matches
+        let dateMatch;
+        while ((dateMatch = datePattern.exec(allText))) uniqueDates.add(dateMatch[0]);
+        
+        // Use the most reliable count
+        if (activityCards.length > 0) {
+            runCount = activityCards.length;
+        } else if (uniqueDates.size > 0) {
+            runCount = uniqueDates.size;
+        } else if (distanceTimeCount > 0) {
+            runCount = distanceTimeCount;
+        } else if (hasContent) {
+            // Fallback: assume 1 activity if there's meaningful content
+            runCount = 1;
+        }
+        
+        if (!verbose) {
+            // Counts only; skip extracting per-activity details
+        } else if (activityCards.length > 0) {
+            // Card containers already delimit activities; hand their
+            // text straight to Python instead of re-splitting by date
+            cardTexts = activityCards.slice(0, 10).map(card => card.textContent.trim());
+        } else {
+            // Split the text between successive dates into per-activity
+            // segments and extract the date/distance/time fields
+            const starts = [];
+            let match;
+            while ((match = datePattern.exec(allText))) starts.push(match.index);
+            const segments = starts.map((start, i) =>
+                allText.slice(start, i + 1 < starts.length ? starts[i + 1] : allText.length)
+            );
+            
+            const activityDatePattern = /\\d{1,2}\\/\\d{1,2}\\/\\d{4}(?:\\s+\\d{1,2}:\\d{2}:\\d{2}\\s*[AP]M)?/;
+            const distancePattern = /📏\\s*[\\d.]+\\s*mi/;
+            const timePattern = /⏱️\\s*\\d+:\\d+/;
+            for (const segment of segments.slice(0, 10)) {
+                const text = segment.replace(/\\s+/g, ' ').trim();
+                const date = text.match(activityDatePattern);
+                const distance = text.match(distancePattern);
+                const time = text.match(timePattern);
+                if (date || distance || time) {
+                    activities.push({
+                        date: date ? date[0] : null,
+                        distance: distance ? distance[0] : null,
+                        time: time ? time[0] : null
+                    });
+                }
+            }
+        }
+    }
+    
+    // Only a preview crosses the WebDriver bridge, not the whole panel, and
+    // only when no structured activities were extracted to print instead
+    const needsPreview = verbose && activities.length === 0 && !cardTexts;
+    
+    return {
+        visible: isVisible,
+        hasContent: hasContent,
+        runCount: runCount,
+        // Computed style is only read (and returned) when offsetParent was null
+        display: styles ? styles.display : null,
+        visibility: styles ? styles.visibility : null,
+        textPreview: needsPreview
+            ? (allText.length > 200 ? allText.slice(0, 200) + '…' : allText)
+            : null,
+        textLength: allText.length,
+        activities: activities,
+        cardTexts: cardTexts
+    };
+"""
+
+# Map, canvas and style layer state (debug_rendering_state)
+_RENDERING_STATE_JS = """
+    const canvas = map.getCanvas();
+    const gl = canvas.getContext('webgl') || canvas.getContext('webgl2');
+    // Serialize the style once and read layer visibility from it directly
+    const style = map.getStyle();
+    
+    return {
+        mapLoaded: map.loaded(),
+        mapStyle: !!style,
+        canvasSize: {w: canvas.width, h: canvas.height},
+        webglContext: !!gl,
+        layers: style.layers.map(l => ({
+            id: l.id,
+            type: l.type,
+            visible: (l.layout && l.layout.visibility) !== 'none'
+        })),
+        sources: Object.keys(style.sources)
+    };
+"""
+
+# Activity features rendered in the current viewport (verify_features_in_current_viewport)
+_VIEWPORT_FEATURES_JS = """
+    const bounds = map.getBounds();
+    const zoom = map.getZoom();
+    
+    // Query only the activity layers (packaged runs and uploaded overlay)
+    // rather than every rendered feature; querying a missing layer errors
+    const activityLayers = ['runsVec', 'localRunsOverlay'].filter(id => map.getLayer(id));
+    const renderedFeatures = activityLayers.length > 0
+        ? map.queryRenderedFeatures({ layers: activityLayers })
+        : [];
+    
+    // Filter to only LineString features (activity routes)
+    const activityFeatures = renderedFeatures.filter(f => 
+        f.geometry && f.geometry.type === 'LineString'
+    );
+    
+    // Summarize the sample so its geometry never crosses the WebDriver bridge,
+    // and only include it at all when the caller asked for verbose output
+    const verbose = !!(arguments[0] && arguments[0].verbose);
+    const sample = verbose ? activityFeatures[0] : null;
+    
+    return {
+        viewportBounds: bounds.toArray(),
+        zoom: zoom,
+        totalRenderedFeatures: renderedFeatures.length,
+        featuresInViewport: activityFeatures.length,
+        sampleFeature: sample ? { id: sample.id, properties: sample.properties } : null,
+        viewportCenter: [
+            (bounds.getWest() + bounds.getEast()) / 2,
+            (bounds.getSouth() + bounds.getNorth()) / 2
+        ]
+    };
+"""
+
+def retry_on_stale(attempts=3, backoff=0.2):
+    """
+    Retry a page-state helper when the DOM or map changes mid-call.
+    Catches stale element references and script errors (e.g. map or panel
+    transiently missing), sleeping backoff * 2**attempt between tries.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except (StaleElementReferenceException, JavascriptException) as e:
+                    if attempt == attempts - 1:
+                        raise
+                    print(f"⚠️ {func.__name__} hit {type(e).__name__}, retrying...")
+                    time.sleep(backoff * 2 ** attempt)
+        return wrapper
+    return decorator
+
 class BaseMobileTest:
     """Base class providing common mobile test functionality"""
     
+    # Context cache state; instances shadow these once they cache a context
+    _current_context_cache = None
+    _context_cache_timestamp = 0  # monotonic_ns() of the last cache update
+    # Every successful switch refreshes the cache, so it can stay valid longer
+    _CACHE_TIMEOUT_NS = 30 * 1_000_000_000  # 30 seconds
+    
+    # Last WebView context switch_to_webview resolved; the name is stable across
+    # sessions, so later switches try it before listing contexts
+    _cached_webview_context = None
+    
+    # Pattern name -> selector that last resolved it, shared by all test classes
+    _selector_cache = {}
+    
+    # Set once the Appium server rejects execute_driver; shared by all test
+    # classes, since pytest makes a new instance for every test
+    _execute_driver_unavailable = False
+    
     def get_current_context_cached(self, driver):
         """Get current context with caching to reduce WebDriver round trips"""
-        import time
-        
-        # Initialize cache attributes if they don't exist (lazy initialization)
-        if not hasattr(self, '_current_context_cache'):
-            self._current_context_cache = None
-            self._context_cache_timestamp = 0
-            self._cache_timeout = 5  # seconds
-        
-        current_time = time.time()
+        now = monotonic_ns()
         
         # Return cached result if still valid
-        if (self._current_context_cache and 
-            (current_time - self._context_cache_timestamp) < self._cache_timeout):
-            return self._current_context_cache
+        cached = self._current_context_cache
+        if cached is not None and (now - self._context_cache_timestamp) < self._CACHE_TIMEOUT_NS:
+            return cached
         
         # Cache miss - fetch and cache the result
         self._current_context_cache = driver.current_context
-        self._context_cache_timestamp = current_time
+        self._context_cache_timestamp = now
         return self._current_context_cache
     
     def invalidate_context_cache(self):
         """Invalidate context cache after context switches"""
-        # Initialize cache attributes if they don't exist (lazy initialization)
-        if not hasattr(self, '_current_context_cache'):
-            self._current_context_cache = None
-            self._context_cache_timestamp = 0
-            self._cache_timeout = 5  # seconds
-        else:
-            self._current_context_cache = None
-            self._context_cache_timestamp = 0
+        self._current_context_cache = None
+        self._context_cache_timestamp = 0
+    
+    def _remember_context(self, context):
+        """Cache the context a successful switch just landed in"""
+        self._current_context_cache = context
+        self._context_cache_timestamp = monotonic_ns()
     
     def switch_to_context_optimized(self, driver, target_context, max_attempts=2):
-        """Optimized context switching with caching and minimal verification"""
+        """Optimized context switching with caching and no extra verification round trips"""
         # Check if we're already in the target context
         current = self.get_current_context_cached(driver)
         if current == target_context:
@@ -55,36 +359,18 @@ class BaseMobileTest:
         for attempt in range(max_attempts):
             try:
                 print(f"🔄 Switching to context: {target_context} (attempt {attempt + 1})")
+                # Appium raises if the switch fails, so no verification probe is needed
                 driver.switch_to.context(target_context)
                 
-                # Invalidate cache and verify switch
-                self.invalidate_context_cache()
-                
-                # Quick verification without expensive waits
-                if target_context == 'NATIVE_APP':
-                    # For native context, just verify we can access native elements
-                    try:
-                        driver.find_elements("xpath", "//*[@clickable='true']")
-                        print(f"✅ Successfully switched to: {target_context}")
-                        return target_context
-                    except:
-                        pass  # May not have clickable elements yet, but context switch succeeded
-                else:
-                    # For WebView context, verify DOM access
-                    try:
-                        driver.execute_script("return document.readyState")
-                        print(f"✅ Successfully switched to: {target_context}")
-                        return target_context
-                    except:
-                        pass  # May not be ready yet
+                # The switch succeeded, so the current context is known - cache it
+                self._remember_context(target_context)
                 
                 print(f"✅ Context switch completed: {target_context}")
                 return target_context
                 
-            except Exception as e:
+            except WebDriverException as e:
                 print(f"⚠️ Context switch attempt {attempt + 1} failed: {e}")
                 if attempt < max_attempts - 1:
-                    import time
                     time.sleep(1)  # Minimal retry delay
                     continue
                 else:
@@ -92,15 +378,15 @@ class BaseMobileTest:
         
         raise Exception(f"Failed to switch to context {target_context} after {max_attempts} attempts")
     
-    def wait_for_webview_available(self, driver, wait, verbose=False):
+    def wait_for_webview_available(self, driver, verbose=False, timeout=TestConfig.EXPLICIT_WAIT):
         """
         Dynamically wait for WebView context to become available.
         Replaces fixed startup sleep calls with responsive waiting.
         
         Args:
             driver: Selenium WebDriver instance  
-            wait: WebDriverWait instance
             verbose: Enable detailed logging
+            timeout: Seconds to wait for the WebView context
             
         Returns:
             True when WebView context is available
@@ -108,35 +394,41 @@ class BaseMobileTest:
         Raises:
             TimeoutException: If WebView doesn't become available within timeout
         """
+        # Last contexts seen, so verbose output only fires when the list changes
+        last_contexts = None
+        
         def webview_available():
+            nonlocal last_contexts
             try:
                 contexts = driver.contexts
-                if verbose:
+                changed = contexts != last_contexts
+                last_contexts = contexts
+                if verbose and changed:
                     print(f"🔍 Available contexts: {contexts}")
                 
                 # Look for our app's WebView context
-                for context in contexts:
-                    if 'WEBVIEW_com.run.heatmap' in context:
-                        if verbose:
-                            print(f"✅ Found target WebView: {context}")
-                        return True
-                    elif 'WEBVIEW' in context and 'webview_shell' not in context:
-                        if verbose:
-                            print(f"✅ Found fallback WebView: {context}")
-                        return True
+                context = _pick_webview_context(contexts)
+                if context:
+                    if verbose:
+                        kind = "target" if _APP_WEBVIEW in context else "fallback"
+                        print(f"✅ Found {kind} WebView: {context}")
+                    return True
                         
-                if verbose:
+                if verbose and changed:
                     print("⏳ WebView not yet available, continuing to wait...")
                 return False
-            except Exception as e:
+            except WebDriverException as e:
                 if verbose:
                     print(f"⚠️ Error checking contexts: {e}")
                 return False
         
         if verbose:
             print("⏳ Waiting for WebView context to become available...")
-            
-        wait.until(lambda driver: webview_available())
+        
+        # Each poll is a driver.contexts round trip to Appium; poll on a tighter
+        # interval than the default 500ms
+        poll_wait = WebDriverWait(driver, timeout, poll_frequency=0.2)
+        poll_wait.until(lambda driver: webview_available())
         
         if verbose:
             print("✅ WebView context is now available!")
@@ -168,7 +460,7 @@ class BaseMobileTest:
             verbose: Enable detailed logging
             
         Returns:
-            True if map settled successfully, False if fallback was used
+            True if map settled successfully, False if the fallback cap was hit
         """
         if verbose:
             print(f"⏳ Waiting for map to settle (timeout: {timeout_ms}ms)...")
@@ -178,8 +470,9 @@ class BaseMobileTest:
                 if (window.__mapTestHelpers && window.__mapTestHelpers.waitForIdleAfterMove) {{
                     window.__mapTestHelpers.waitForIdleAfterMove({timeout_ms}).then(() => resolve(true));
                 }} else {{
-                    // Fallback if helpers not available
-                    setTimeout(() => resolve(false), 3000);
+                    // Fallback if helpers not available: settle on the next idle, capped short
+                    map.once('idle', () => resolve(true));
+                    setTimeout(() => resolve(false), 500);
                 }}
             }});
         """)
@@ -188,145 +481,232 @@ class BaseMobileTest:
             if wait_success:
                 print("✅ Map settled using JavaScript helpers")
             else:
-                print("⚠️ Used fallback timeout (JavaScript helpers not available)")
+                print("⚠️ Map did not report idle within fallback cap (JavaScript helpers not available)")
         
         return wait_success
+
+    def fly_and_wait_idle(self, driver, fly_opts, timeout_ms=8000, verbose=False, method='flyTo'):
+        """
+        Move the map and wait for it to settle in a single WebDriver round-trip.
+        Combines the map.flyTo()/map.jumpTo() call with the idle wait that
+        wait_for_map_idle_after_move() would otherwise issue separately.
+
+        Args:
+            driver: Selenium WebDriver instance
+            fly_opts: Camera options passed to the map (center, zoom, duration, ...)
+            timeout_ms: Maximum time to wait in milliseconds (default 8000)
+            verbose: Enable detailed logging
+            method: Map camera method to call, 'flyTo' or 'jumpTo'
+
+        Returns:
+            True if map settled successfully, False if the timeout was hit
+        """
+        if method not in ('flyTo', 'jumpTo'):
+            raise ValueError(f"Unsupported map camera method: {method}")
+
+        if verbose:
+            print(f"⏳ Moving map with {method} and waiting for it to settle (timeout: {timeout_ms}ms)...")
+
+        wait_success = driver.execute_async_script("""
+            const cb = arguments[arguments.length - 1];
+            const timeoutMs = arguments[1];
+            const helpers = window.__mapTestHelpers;
+            if (helpers && helpers.waitForIdleAfterMove) {
+                map[arguments[2]](arguments[0]);
+                helpers.waitForIdleAfterMove(timeoutMs).then(() => cb(true), () => cb(false));
+            } else {
+                // Register before moving so a fast jumpTo cannot fire idle unobserved
+                map.once('idle', () => cb(true));
+                setTimeout(() => cb(false), timeoutMs);
+                map[arguments[2]](arguments[0]);
+            }
+        """, fly_opts, timeout_ms, method)
+
+        if verbose:
+            if wait_success:
+                print("✅ Map settled after move")
+            else:
+                print("⚠️ Map did not report idle before timeout")
+
+        return wait_success
+
+    def _switch_to_webview_batched(self, driver):
+        """
+        Find and switch to the app's WebView in a single Appium execute_driver call.
+        Returns the WebView context name, or None when no WebView is available or
+        the Appium server lacks the execute-driver plugin (remembered after the
+        first failure so later switches go straight to individual commands).
+        """
+        if self._execute_driver_unavailable:
+            return None
+        
+        try:
+            return driver.execute_driver(_SWITCH_TO_WEBVIEW_DRIVER_SCRIPT).result
+        except WebDriverException as e:
+            print(f"⚠️ Batched WebView switch unavailable, using individual commands: {e}")
+            BaseMobileTest._execute_driver_unavailable = True
+            return None
     
     def switch_to_webview(self, driver, max_attempts=3):
         """
         Switch to WebView context with retry logic and interference handling.
         Consolidated from multiple test files.
+        
+        Keeps the context cache in step with every switch made here, so
+        switch_to_context_optimized never trusts a context left behind.
         """
+        # Any switch below changes the current context; drop the cached one up front
+        self.invalidate_context_cache()
+        
+        cached_webview = self._cached_webview_context
+        if cached_webview:
+            try:
+                driver.switch_to.context(cached_webview)
+                if driver.execute_async_script(_WAIT_FOR_DOCUMENT_READY_JS):
+                    print(f"✅ Switched to cached WebView: {cached_webview}")
+                    self._remember_context(cached_webview)
+                    return cached_webview
+            except WebDriverException as e:
+                print(f"⚠️ Cached WebView {cached_webview} unavailable, looking up contexts: {e}")
+        
+        last_contexts = None
         for attempt in range(max_attempts):
+            # Contexts fetched this attempt, reused by the interference check on failure
+            contexts = []
             try:
                 print(f"🔄 WebView context switch attempt {attempt + 1}/{max_attempts}")
-                contexts = driver.contexts
-                print(f"📱 Available contexts: {contexts}")
-                
-                # Filter to find our app's WebView, avoiding interference from other webviews
-                target_webview = None
-                for context in contexts:
-                    if 'WEBVIEW_com.run.heatmap' in context:
-                        target_webview = context
-                        break
-                    elif 'WEBVIEW' in context and 'webview_shell' not in context:
-                        target_webview = context  # Fallback
                 
+                # Contexts lookup + switch in one round trip when the server supports it
+                target_webview = self._switch_to_webview_batched(driver)
                 if target_webview:
-                    print(f"🎯 Targeting WebView: {target_webview}")
-                    driver.switch_to.context(target_webview)
+                    print(f"🎯 Switched to WebView: {target_webview}")
+                else:
+                    contexts = driver.contexts
+                    if contexts != last_contexts:
+                        print(f"📱 Available contexts: {contexts}")
+                        last_contexts = contexts
                     
-                    # Use dynamic wait instead of sleep for DOM readiness
-                    from selenium.webdriver.support.ui import WebDriverWait
-                    WebDriverWait(driver, 5).until(
-                        lambda d: d.execute_script("return typeof document !== 'undefined' && document.readyState === 'complete'")
-                    )
+                    # Filter to find our app's WebView, avoiding interference from other webviews
+                    target_webview = _pick_webview_context(contexts)
+                    
+                    if target_webview:
+                        print(f"🎯 Targeting WebView: {target_webview}")
+                        driver.switch_to.context(target_webview)
+                
+                if target_webview:
+                    # Wait for DOM readiness in one async round trip instead of polling
+                    if not driver.execute_async_script(_WAIT_FOR_DOCUMENT_READY_JS):
+                        raise TimeoutException("WebView document did not finish loading")
                     print(f"✅ Successfully switched to: {target_webview}")
+                    type(self)._cached_webview_context = target_webview
+                    self._remember_context(target_webview)
                     return target_webview
                 else:
                     print("⚠️ No suitable WebView context found")
                     
-            except Exception as e:
+            except WebDriverException as e:
                 print(f"⚠️ WebView switch attempt {attempt + 1} failed: {e}")
-                if attempt < max_attempts - 1:
-                    print("🔄 Waiting before retry...")
-                    # Use exponential backoff with WebDriverWait
-                    from selenium.webdriver.support.ui import WebDriverWait
-                    try:
-                        # Quick retry with context cleanup
-                        if 'org.chromium.webview_shell' in str(driver.contexts):
-                            print("🧹 Attempting to clear webview_shell interference...")
-                            driver.switch_to.context('NATIVE_APP')
-                            WebDriverWait(driver, 2).until(lambda d: d.current_context == 'NATIVE_APP')
-                    except:
-                        pass
-                    # Use dynamic wait instead of fixed sleep
-                    WebDriverWait(driver, 2 + attempt).until(lambda d: True)  # Exponential backoff
-                    continue
-                else:
+                if attempt == max_attempts - 1:
                     raise
+                print("🔄 Retrying WebView switch...")
+                try:
+                    # Quick retry with context cleanup; switch_to.context raises
+                    # on failure, so no separate current_context check is needed
+                    if any(_WEBVIEW_SHELL in context for context in contexts):
+                        print("🧹 Attempting to clear webview_shell interference...")
+                        driver.switch_to.context('NATIVE_APP')
+                        self.invalidate_context_cache()
+                except WebDriverException:
+                    pass
+            
+            if attempt < max_attempts - 1:
+                # Back off before retrying (0.25s, 0.5s, capped at 1s), but retry as
+                # soon as a usable WebView context shows up
+                try:
+                    WebDriverWait(driver, min(0.25 * 2 ** attempt, 1.0), poll_frequency=0.1).until(
+                        lambda d: _pick_webview_context(d.contexts)
+                    )
+                except WebDriverException:
+                    pass
         
         raise Exception("Failed to switch to WebView context after all attempts")
     
-    def find_clickable_element(self, driver, wait, selector):
+    def find_clickable_element(self, driver, wait, selector, probe_timeout=2, click=False):
         """
         Find element that might be blocked by other elements.
         Consolidated from multiple test files.
+        
+        The clickable check only gets probe_timeout seconds (None uses
+        TestConfig.EXPLICIT_WAIT) so intentionally obscured elements are found
+        quickly; the fallback still waits for the element to exist.
+        
+        With click set, the element is also clicked exactly once: natively when
+        it is clickable, otherwise from JavaScript. Callers that click must use
+        this rather than clicking the returned element, so toggles don't fire twice.
         """
+        if probe_timeout is None:
+            probe_timeout = TestConfig.EXPLICIT_WAIT
         try:
             # First try normal clickable wait
-            element = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
+            probe_wait = WebDriverWait(driver, probe_timeout, poll_frequency=0.1)
+            element = probe_wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
+            if click:
+                element.click()
             return element
         except (TimeoutException, ElementClickInterceptedException):
-            # Fallback: just find the element and use ActionChains
-            print(f"⚠️ Using ActionChains fallback for element: {selector}")
-            element = driver.find_element(By.CSS_SELECTOR, selector)
-            
-            # Use ActionChains to click
-            actions = ActionChains(driver)
-            actions.move_to_element(element).click().perform()
-            time.sleep(1)
+            # Fallback: find the element and, if asked, click it from JavaScript in one round trip
+            element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            if click:
+                print(f"⚠️ Using JavaScript click fallback for element: {selector}")
+                driver.execute_script(
+                    "arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();",
+                    element
+                )
             return element
     
+    def find_by_pattern(self, driver, wait, pattern_name, probe_timeout=2, click=False):
+        """
+        Find a control from _ELEMENT_PATTERNS, like find_clickable_element
+        (including its click=True mode, which clicks the control exactly once).
+        
+        The selector that last worked for the pattern is tried first, bounded by
+        probe_timeout. If it no longer matches, it is dropped from the cache and
+        the pattern's selectors are checked in order in a single script call.
+        """
+        cached = self._selector_cache.get(pattern_name)
+        if cached:
+            try:
+                probe_wait = WebDriverWait(driver, probe_timeout, poll_frequency=0.1)
+                return self.find_clickable_element(driver, probe_wait, cached, probe_timeout, click)
+            except TimeoutException:
+                print(f"⚠️ Cached selector {cached} for {pattern_name} no longer matches, rediscovering")
+                self._selector_cache.pop(pattern_name, None)
+        
+        selectors = list(_ELEMENT_PATTERNS[pattern_name])
+        selector = wait.until(lambda d: d.execute_script(_FIRST_PRESENT_SELECTOR_JS, selectors))
+        if selector != selectors[0]:
+            print(f"🩹 {pattern_name} resolved by fallback selector: {selector}")
+        self._selector_cache[pattern_name] = selector
+        return self.find_clickable_element(driver, wait, selector, probe_timeout, click)
+    
     
-    def check_side_panel(self, driver):
+    @retry_on_stale()
+    def check_side_panel(self, driver, verbose=False, details=None):
         """
         Check if side panel opened and has content.
         Consolidated from multiple test files.
+        
+        Only visibility and counts are returned unless verbose is set, in which
+        case per-activity details are fetched and the panel summary is printed.
+        details fetches the per-activity details without printing (it defaults
+        to verbose), for pollers that print the summary once they're done.
         """
-        panel_info = driver.execute_script("""
-            const panel = document.getElementById('side-panel');
-            const panelContent = document.getElementById('panel-content');
-            
-            if (!panel) return { visible: false, error: 'No side panel element' };
-            
-            const styles = window.getComputedStyle(panel);
-            const isVisible = styles.display !== 'none' && styles.visibility !== 'hidden';
-            
-            let runCount = 0;
-            let hasContent = false;
-            let allText = '';
-            
-            if (panelContent) {
-                hasContent = panelContent.textContent.trim().length > 10;
-                allText = panelContent.textContent.trim();
-                
-                // Try different strategies to count actual activity cards
-                // Strategy 1: Look for specific activity card containers
-                let activityCards = panelContent.querySelectorAll('.activity-card, .run-item, [data-activity], [data-run-id]');
-                
-                // Strategy 2: Look for date patterns (each activity should have a date)
-                const dateMatches = allText.match(/\\d{1,2}\\/\\d{1,2}\\/\\d{4}/g);
-                const uniqueDates = dateMatches ? [...new Set(dateMatches)] : [];
-                
-                // Strategy 3: Look for distance/time pattern combinations (📏 + ⏱️)
-                const distanceTimePattern = /📏[^⏱️]*⏱️/g;
-                const distanceTimeMatches = allText.match(distanceTimePattern);
-                
-                // Use the most reliable count
-                if (activityCards.length > 0) {
-                    runCount = activityCards.length;
-                } else if (uniqueDates.length > 0) {
-                    runCount = uniqueDates.length;
-                } else if (distanceTimeMatches && distanceTimeMatches.length > 0) {
-                    runCount = distanceTimeMatches.length;
-                } else if (hasContent) {
-                    // Fallback: assume 1 activity if there's meaningful content
-                    runCount = 1;
-                }
-            }
-            
-            return {
-                visible: isVisible,
-                hasContent: hasContent,
-                runCount: runCount,
-                display: styles.display,
-                visibility: styles.visibility,
-                fullText: allText
-            };
-        """)
+        if details is None:
+            details = verbose
+        panel_info = driver.execute_script(_SIDE_PANEL_JS, {'verbose': details})
         
-        self._print_formatted_panel_info(panel_info)
+        if verbose:
+            self._print_formatted_panel_info(panel_info)
         return panel_info
     
     def _print_formatted_panel_info(self, panel_info):
@@ -339,9 +719,12 @@ class BaseMobileTest:
         
         # Panel visibility
         if panel_info.get('visible', False):
-            display = panel_info.get('display', 'unknown')
-            visibility = panel_info.get('visibility', 'unknown')
-            print(f"   ✅ Visible (display: {display}, visibility: {visibility})")
+            display = panel_info.get('display')
+            if display:
+                visibility = panel_info.get('visibility', 'unknown')
+                print(f"   ✅ Visible (display: {display}, visibility: {visibility})")
+            else:
+                print("   ✅ Visible")
         else:
             print(f"   ❌ Not visible")
             if 'error' in panel_info:
@@ -359,10 +742,28 @@ class BaseMobileTest:
         if run_count > 0:
             print(f"   🏃 Found {run_count} activit{'ies' if run_count != 1 else 'y'}:")
             
-            # Parse and format the full text
-            full_text = panel_info.get('fullText', '')
-            if full_text:
-                activities = self._parse_activities_from_text(full_text)
+            # Activities are pre-split in the browser (card text when the panel
+            # has card containers, extracted fields otherwise); only fall back
+            # to parsing the panel text preview when neither is available
+            text_preview = panel_info.get('textPreview') or ''
+            if panel_info.get('cardTexts'):
+                activities = []
+                for card_text in panel_info['cardTexts']:
+                    activity = self._format_single_activity(card_text)
+                    if activity and activity not in activities:
+                        activities.append(activity)
+            elif panel_info.get('activities'):
+                activities = []
+                for fields in panel_info['activities']:
+                    activity = self._format_activity_fields(fields)
+                    if activity and activity not in activities:
+                        activities.append(activity)
+            elif text_preview:
+                activities = self._parse_activities_from_text(text_preview)
+            else:
+                activities = []
+            
+            if activities:
                 for i, activity in enumerate(activities, 1):
                     print(f"      {i}. {activity}")
             else:
@@ -370,99 +771,92 @@ class BaseMobileTest:
         else:
             print("   📝 Panel has content but no activities detected")
             # Show a snippet of the content for debugging
-            full_text = panel_info.get('fullText', '')
-            if full_text:
-                snippet = full_text.replace('\n', ' ').strip()[:100]
+            text_preview = panel_info.get('textPreview') or ''
+            if text_preview:
+                snippet = text_preview.replace('\n', ' ').strip()[:100]
                 if len(snippet) == 100:
                     snippet += "..."
                 print(f"      Content snippet: {snippet}")
     
     def _parse_activities_from_text(self, full_text):
         """Parse individual activities from the panel's full text"""
-        import re
-        
-        activities = []
+        # Limit to _MAX_LISTED_ACTIVITIES to avoid spam; the generator stops
+        # formatting as soon as enough activities are produced
+        return list(islice(self._iter_activities(full_text), _MAX_LISTED_ACTIVITIES))
+    
+    def _iter_activities(self, full_text):
+        """Lazily yield formatted activities parsed from the panel's full text"""
+        found = False
         
         # Clean up the text - remove excessive whitespace and newlines
-        cleaned_text = re.sub(r'\s+', ' ', full_text).strip()
-        
-        # Look for date patterns (various formats)
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2} [AP]M',  # MM/DD/YYYY HH:MM:SS AM/PM
-            r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',  # ISO format
-            r'\d{1,2}/\d{1,2}/\d{4}',  # MM/DD/YYYY
-        ]
-        
-        # Try to split by date patterns
-        for pattern in date_patterns:
-            matches = list(re.finditer(pattern, cleaned_text))
-            if matches:
-                for match in matches:
-                    date_str = match.group()
-                    # Find the end of this activity (start of next date or end of text)
-                    start_pos = match.start()
-                    next_match = None
-                    for other_match in matches:
-                        if other_match.start() > match.start():
-                            next_match = other_match
-                            break
-                    
-                    if next_match:
-                        end_pos = next_match.start()
-                    else:
-                        end_pos = len(cleaned_text)
-                    
+        cleaned_text = _WS_RE.sub(' ', full_text).strip()
+        
+        # Try to split by date patterns (various formats)
+        for pattern in _DATE_PATTERNS:
+            # split() alternates [text before, date, text after date, date, ...],
+            # so each activity is a date plus the text up to the next date
+            parts = pattern.split(cleaned_text)
+            if len(parts) > 1:
+                seen = set()
+                for i in range(1, len(parts), 2):
                     # Extract the activity text
-                    activity_text = cleaned_text[start_pos:end_pos].strip()
+                    activity_text = (parts[i] + parts[i + 1]).strip()
                     
-                    # Clean up and format the activity
-                    activity = self._format_single_activity(activity_text)
-                    if activity and activity not in activities:
-                        activities.append(activity)
+                    # Format the activity (already whitespace-normalized above)
+                    activity = self._format_single_activity_precleaned(activity_text)
+                    if activity and activity not in seen:
+                        seen.add(activity)
+                        found = True
+                        yield activity
                 break
         
         # If no date patterns found, try to split by emojis or other markers
-        if not activities:
+        if not found:
             # Split by running emoji or other common separators
-            parts = re.split(r'🏃|🚴|🏊', cleaned_text)
+            parts = _ACTIVITY_SPLIT_RE.split(cleaned_text)
             for part in parts:
                 part = part.strip()
                 if part and len(part) > 10:  # Ignore very short fragments
-                    activity = self._format_single_activity(part)
+                    activity = self._format_single_activity_precleaned(part)
                     if activity:
-                        activities.append(activity)
-        
-        # If still no activities, return the cleaned text as one activity
-        if not activities and cleaned_text:
-            activities.append(self._format_single_activity(cleaned_text))
+                        found = True
+                        yield activity
         
-        return activities[:10]  # Limit to 10 activities to avoid spam
+        # If still no activities, yield the cleaned text as one activity
+        if not found and cleaned_text:
+            yield self._format_single_activity_precleaned(cleaned_text)
+    
+    def _format_activity_fields(self, fields):
+        """Format an activity pre-split by check_side_panel's script for display"""
+        return ' - '.join(
+            fields[key] for key in ('date', 'distance', 'time') if fields.get(key)
+        )
     
     def _format_single_activity(self, activity_text):
         """Format a single activity text for display"""
-        import re
-        
         # Remove excessive whitespace
-        activity = re.sub(r'\s+', ' ', activity_text).strip()
-        
+        return self._format_single_activity_precleaned(_WS_RE.sub(' ', activity_text).strip())
+    
+    def _format_single_activity_precleaned(self, activity):
+        """Format a single activity text whose whitespace is already normalized"""
         # Remove common UI artifacts
-        activity = re.sub(r'^\s*🏃\s*', '', activity)  # Remove leading running emoji
+        activity = _LEADING_RUNNER_RE.sub('', activity)  # Remove leading running emoji
         
         # Extract meaningful parts (date, distance, time)
         parts = []
         
         # Look for date
-        date_match = re.search(r'\d{1,2}/\d{1,2}/\d{4}(?:\s+\d{1,2}:\d{2}:\d{2}\s*[AP]M)?', activity)
+        date_match = _DATE_RE.search(activity)
         if date_match:
             parts.append(date_match.group())
         
         # Look for distance (with emoji)
-        distance_match = re.search(r'📏\s*[\d.]+\s*mi', activity)
+        distance_match = _DISTANCE_RE.search(activity)
         if distance_match:
             parts.append(distance_match.group())
         
         # Look for time (with emoji)  
-        time_match = re.search(r'⏱️\s*\d+:\d+', activity)
+        time_match = _TIME_RE.search(activity)
         if time_match:
             parts.append(time_match.group())
         
@@ -475,6 +869,7 @@ class BaseMobileTest:
         else:
             return activity[:97] + "..."
     
+    @retry_on_stale()
     def get_selected_runs_details(self, driver):
         """
         Extract details about selected runs from side panel.
@@ -486,21 +881,22 @@ class BaseMobileTest:
             
             if (!panel || !panelContent) return [];
             
-            const runs = [];
-            
-            // Look for run cards or similar elements
-            const runElements = panelContent.querySelectorAll('.run-card, [class*="run"], .activity-item, [data-run]');
+            // Look for run cards or similar elements, capped to bound the payload
+            const runElements = Array.from(
+                panelContent.querySelectorAll('.run-card, [class*="run"], .activity-item, [data-run]')
+            ).slice(0, 50);
             
-            runElements.forEach(element => {
-                const textContent = element.textContent || '';
-                const title = element.querySelector('h3, h4, .title, .name');
-                const date = element.querySelector('.date, .time');
-                
-                runs.push({
-                    name: title ? title.textContent.trim() : textContent.slice(0, 50),
-                    fullText: textContent.trim(),
+            // Plain data per run; long card text is clipped before crossing the bridge
+            const clip = text => text.length > 200 ? text.slice(0, 200) + '…' : text;
+            const runs = runElements.map(element => {
+                const textContent = (element.textContent || '').trim();
+                return {
+                    name: element.querySelector('h3, h4, .title, .name')?.textContent.trim()
+                        ?? textContent.slice(0, 50),
+                    date: element.querySelector('.date, .time')?.textContent.trim() ?? null,
+                    fullText: clip(textContent),
                     hasElement: true
-                });
+                };
             });
             
             // If no specific run elements found, check for general text content
@@ -509,7 +905,8 @@ class BaseMobileTest:
                 if (allText.length > 10) {
                     runs.push({
                         name: 'Unknown Run',
-                        fullText: allText,
+                        date: null,
+                        fullText: clip(allText),
                         hasElement: false
                     });
                 }
@@ -520,60 +917,58 @@ class BaseMobileTest:
         
         return runs_info or []
     
+    @retry_on_stale()
     def debug_rendering_state(self, driver):
         """
         Get complete rendering state for debugging.
         Consolidated from rock-solid test methods.
         """
-        return driver.execute_script("""
-            const canvas = map.getCanvas();
-            const gl = canvas.getContext('webgl') || canvas.getContext('webgl2');
-            
-            return {
-                mapLoaded: map.loaded(),
-                mapStyle: !!map.getStyle(),
-                canvasSize: {w: canvas.width, h: canvas.height},
-                webglContext: !!gl,
-                layers: map.getStyle().layers.map(l => ({
-                    id: l.id,
-                    type: l.type,
-                    visible: map.getLayoutProperty(l.id, 'visibility') !== 'none'
-                })),
-                sources: Object.keys(map.getStyle().sources)
-            };
-        """)
+        return driver.execute_script(_RENDERING_STATE_JS)
     
-    def verify_features_in_current_viewport(self, driver):
+    @retry_on_stale()
+    def verify_features_in_current_viewport(self, driver, verbose=False):
         """
         Verify activity features are visible in current viewport.
         Consolidated from rock-solid test methods.
+        
+        sampleFeature is only populated when verbose is set.
         """
-        verification = driver.execute_script("""
-            const bounds = map.getBounds();
-            const zoom = map.getZoom();
-            
-            // Query only features that are actually rendered in current viewport
-            const renderedFeatures = map.queryRenderedFeatures();
-            
-            // Filter to only LineString features (activity routes)
-            const activityFeatures = renderedFeatures.filter(f => 
-                f.geometry && f.geometry.type === 'LineString'
-            );
-            
-            return {
-                viewportBounds: bounds.toArray(),
-                zoom: zoom,
-                totalRenderedFeatures: renderedFeatures.length,
-                featuresInViewport: activityFeatures.length,
-                sampleFeature: activityFeatures[0] || null,
-                viewportCenter: [
-                    (bounds.getWest() + bounds.getEast()) / 2,
-                    (bounds.getSouth() + bounds.getNorth()) / 2
-                ]
-            };
-        """)
+        verification = driver.execute_script(_VIEWPORT_FEATURES_JS, {'verbose': verbose})
         
         print(f"🗺️ Current viewport verification: {verification['featuresInViewport']} activity features visible")
         print(f"📊 Viewport center: {verification['viewportCenter']}, zoom: {verification['zoom']}")
         
-        return verification
\ No newline at end of file
+        return verification
+    
+    @retry_on_stale()
+    def snapshot(self, driver, rendering=False, viewport=False, panel=False, verbose=False):
+        """
+        Fetch several map/panel state slices in a single execute_script round trip.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            rendering: Include debug_rendering_state() data under 'rendering'
+            viewport: Include verify_features_in_current_viewport() data under 'viewport'
+            panel: Include check_side_panel() data under 'panel'
+            verbose: Include the verbose-only fields (viewport sampleFeature,
+                panel activity details), without printing anything
+            
+        Returns:
+            Dict with a key for each requested slice (nothing is printed)
+        """
+        slices = [
+            (name, js) for name, js, wanted in (
+                ('rendering', _RENDERING_STATE_JS, rendering),
+                ('viewport', _VIEWPORT_FEATURES_JS, viewport),
+                ('panel', _SIDE_PANEL_JS, panel),
+            ) if wanted
+        ]
+        if not slices:
+            return {}
+        
+        # Each helper body returns its result, so wrap it in its own function,
+        # forwarding the script arguments so it still sees its options in arguments[0]
+        script = "return {" + ",".join(
+            f"{name}: (function() {{{js}}}).apply(null, arguments)" for name, js in slices
+        ) + "};"
+        return driver.execute_script(script, {'verbose': verbose})
\ No newline at end of file
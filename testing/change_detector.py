@@ -5,15 +5,37 @@ Tracks file modifications to skip expensive operations when unchanged.
 """
 
 import os
-import hashlib
-import json
+import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from stat import S_ISREG
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime
 from enum import Enum
 
+if TYPE_CHECKING:
+    from datetime import datetime
+
+
+# Directory names never descended into when scanning (hidden ones are skipped too)
+SKIPPED_DIR_NAMES = frozenset(('node_modules', '__pycache__', 'build', 'dist'))
+
+# File types tracked in the monitored source and data directories
+SOURCE_EXTENSIONS = ('.py', '.js', '.html', '.css', '.java', '.xml', '.json')
+DATA_EXTENSIONS = ('.gpx', '.pkl', '.pmtiles', '.json', '.geojson')
+
+CATEGORIES = ("source_files", "data_files", "config_files")
+
+# Layout of the saved baseline; older baselines are discarded rather than migrated
+BASELINE_VERSION = 4
+
+# Directory mtimes this close to a baseline's scan time aren't trusted to mean "unchanged"
+DIR_MTIME_SLACK_S = 2
+
+# A tree scan younger than this is reused rather than repeated
+BASELINE_CACHE_TTL_S = 2.0
+
 
 class ChangeType(Enum):
     """Types of changes that can be detected."""
@@ -29,7 +51,7 @@ class ChangeReport:
     has_changes: bool
     changed_files: List[Path]
     change_type: ChangeType
-    baseline_time: datetime
+    baseline_time: "datetime"
     skip_build: bool
     skip_data: bool
 
@@ -50,16 +72,25 @@ class ChangeDetector:
     Monitors source files and data files to determine when expensive operations can be skipped.
     """
     
-    def __init__(self, project_root: Optional[Path] = None):
-        """Initialize change detector with project root path."""
+    def __init__(self, project_root: Optional[Path] = None, algorithm: Optional[str] = None):
+        """
+        Initialize change detector with project root path.
+        algorithm is 'mtime' (default), 'checksum' or 'both'; when omitted it
+        comes from the CHANGE_DETECTION_ALGORITHM environment variable.
+        """
         if project_root is None:
             # Default to testing directory parent (project root)
             project_root = Path(__file__).parent.parent
         
         self.project_root = Path(project_root)
+        self.algorithm = algorithm or os.getenv('CHANGE_DETECTION_ALGORITHM', 'mtime')
+        # Same setting as OptimizationConfig.MAX_PARALLEL_WORKERS; bounds the directory scan threads
+        self.max_workers = int(os.getenv('MAX_PARALLEL_WORKERS', '4'))
         self.testing_root = self.project_root / "testing"
         self.cache_dir = self.testing_root / ".change_detector_cache"
-        self.baseline_file = self.cache_dir / "baseline.json"
+        self.baseline_file = self.cache_dir / "baseline.pkl"
+        # Older runs stored the baseline as JSON; it is removed on the next save
+        self.legacy_baseline_file = self.cache_dir / "baseline.json"
         
         # Ensure cache directory exists
         self.cache_dir.mkdir(exist_ok=True)
@@ -81,162 +112,583 @@ class ChangeDetector:
             self.testing_root / "config.py",
             self.testing_root / "pytest.ini",
         ]
+        
+        # Baselines and their comparison, computed once per instance (see _get_baselines, _ensure_diff)
+        self._old_baseline: Optional[Dict] = None
+        self._baseline_cache: Optional[Tuple[float, Dict]] = None  # (monotonic scan time, baseline)
+        self._baselines: Optional[Tuple[Optional[Dict], Dict]] = None  # (saved, current)
+        self._diff: Optional[Dict] = None
+        self._category_changes: Dict[str, bool] = {}  # Early-exit answers from _category_changed()
+        
+        # .gitignore rules used to prune source scans, and the file's (mtime, size)
+        self._ignore_spec, self._ignore_rules_stamp = self._load_ignore_rules()
+        
+        # Filesystem watcher (see start_watching) and the paths it reported per category
+        self._observer = None
+        self._dirty: Dict[str, set] = {category: set() for category in CATEGORIES}
     
-    def _get_file_info(self, file_path: Path) -> Dict:
-        """Get file modification time and size."""
+    def _load_ignore_rules(self):
+        """
+        Compile the project's .gitignore (with pathspec, when installed) so
+        source scans can skip generated trees such as Android build outputs.
+        Returns (spec or None, (mtime_ns, size) of .gitignore or None).
+        """
+        gitignore = self.project_root / ".gitignore"
+        try:
+            import pathspec
+        except ImportError:
+            return None, None
+        
+        try:
+            stat = gitignore.stat()
+            with open(gitignore, 'r') as f:
+                spec = pathspec.PathSpec.from_lines('gitwildmatch', f)
+        except OSError:
+            return None, None
+        return spec, (stat.st_mtime_ns, stat.st_size)
+    
+    def _get_file_info(self, file_path: Path) -> Optional[Tuple[int, int]]:
+        """Get file modification time (integer nanoseconds) and size, or None if it can't be stat'ed."""
         try:
             stat = file_path.stat()
-            return {
-                "mtime": stat.st_mtime,
-                "size": stat.st_size,
-                "exists": True
-            }
+            return stat.st_mtime_ns, stat.st_size
         except (OSError, FileNotFoundError):
-            return {
-                "mtime": 0,
-                "size": 0, 
-                "exists": False
-            }
+            return None
     
-    def _scan_directory(self, directory: Path, extensions: Optional[List[str]] = None) -> Dict[str, Dict]:
-        """Recursively scan directory for file information."""
+    def _scan_directory(self, directory: Path, extensions: Optional[Tuple[str, ...]] = None,
+                        entries_out: Optional[List[Tuple[str, int, int]]] = None,
+                        dir_mtimes_out: Optional[Dict[str, int]] = None,
+                        listing: Optional[Dict[str, Dict]] = None,
+                        ignore_spec=None) -> List[Tuple[str, int, int]]:
+        """
+        Recursively scan directory for (relative path, mtime, size) entries.
+        Walks with os.scandir so each file costs a single stat, taken only after
+        the name-based filters pass, and prunes skipped directories
+        without ever opening them. Entries are appended to entries_out if given,
+        and each visited directory's mtime_ns is recorded in dir_mtimes_out.
+        
+        listing (from _previous_listing) lets directories whose mtime_ns is
+        unchanged skip the directory read: nothing was added, removed or
+        renamed in them, so their recorded files are stat'ed directly and their
+        recorded subdirectories walked. Files are still always stat'ed, since
+        editing a file in place doesn't touch its directory's mtime.
+        
+        ignore_spec (a pathspec.PathSpec) prunes matching files and directories.
+        """
+        file_entries = entries_out if entries_out is not None else []
         if not directory.exists():
-            return {}
+            return file_entries
         
-        file_info = {}
+        # Paths stay plain strings: (absolute, relative to project root) per directory,
+        # with relative paths built by concatenation rather than relpath per entry
+        root_dir = os.fspath(self.project_root)
+        pending = [(os.fspath(directory), os.path.relpath(directory, root_dir))]
         
-        try:
-            for file_path in directory.rglob("*"):
-                if file_path.is_file():
-                    # Filter by extensions if specified
-                    if extensions and file_path.suffix.lower() not in extensions:
-                        continue
-                    
-                    # Skip cache and build directories
-                    if any(part.startswith('.') or part in ['node_modules', '__pycache__', 'build', 'dist'] 
-                           for part in file_path.parts):
-                        continue
-                    
-                    relative_path = str(file_path.relative_to(self.project_root))
-                    file_info[relative_path] = self._get_file_info(file_path)
-        except (OSError, PermissionError) as e:
-            print(f"Warning: Could not scan directory {directory}: {e}")
+        while pending:
+            current, relative_dir = pending.pop()
+            try:
+                dir_mtime = os.stat(current).st_mtime_ns
+            except OSError as e:
+                print(f"Warning: Could not scan directory {current}: {e}")
+                continue
+            if dir_mtimes_out is not None:
+                dir_mtimes_out[relative_dir] = dir_mtime
+            
+            if listing and listing["dir_mtimes"].get(relative_dir) == dir_mtime:
+                # Directory entries unchanged - reuse the recorded listing
+                for relative_path in listing["files"].get(relative_dir, ()):
+                    try:
+                        stat = os.stat(root_dir + os.sep + relative_path)
+                    except OSError:
+                        continue  # Unreadable files count as missing
+                    file_entries.append((relative_path, stat.st_mtime_ns, stat.st_size))
+                pending.extend(
+                    (root_dir + os.sep + subdir, subdir)
+                    for subdir in listing["subdirs"].get(relative_dir, ())
+                )
+                continue
+            
+            relative_prefix = relative_dir + os.sep
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        # Skip hidden files and cache and build directories
+                        if entry.name.startswith('.') or entry.name in SKIPPED_DIR_NAMES:
+                            continue
+                        
+                        relative_path = relative_prefix + entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if ignore_spec is None or not ignore_spec.match_file(relative_path + '/'):
+                                pending.append((entry.path, relative_path))
+                            continue
+                        
+                        # Filter by extensions if specified
+                        if extensions and os.path.splitext(entry.name)[1].lower() not in extensions:
+                            continue
+                        
+                        if ignore_spec is not None and ignore_spec.match_file(relative_path):
+                            continue
+                        
+                        # One stat per file, reused for the type check and the record
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue  # Unreadable files count as missing
+                        if not S_ISREG(stat.st_mode):
+                            continue
+                        file_entries.append((relative_path, stat.st_mtime_ns, stat.st_size))
+            except (OSError, PermissionError) as e:
+                print(f"Warning: Could not scan directory {current}: {e}")
         
-        return file_info
+        return file_entries
     
-    def _get_current_baseline(self) -> Dict:
-        """Get current file baseline for all monitored paths."""
-        baseline = {
-            "timestamp": time.time(),
-            "source_files": {},
-            "data_files": {},
-            "config_files": {}
+    def _previous_listing(self, previous: Optional[Dict], category: str) -> Optional[Dict[str, Dict]]:
+        """
+        Directory listings recorded in a previous baseline, for _scan_directory:
+        trusted directory mtimes plus the files and subdirectories seen in each.
+        Directory mtimes within DIR_MTIME_SLACK_S of the previous scan are not
+        trusted, as a same-tick change after the scan would go unnoticed. None
+        if .gitignore changed since, as the listings were filtered by it.
+        """
+        if not previous or not previous.get("dir_mtimes"):
+            return None
+        if previous.get("ignore_rules") != self._ignore_rules_stamp:
+            return None
+        
+        trusted_before_ns = int((previous["timestamp"] - DIR_MTIME_SLACK_S) * 1_000_000_000)
+        dir_mtimes = {}
+        subdirs = {}
+        for relative_dir, dir_mtime in previous["dir_mtimes"].items():
+            if dir_mtime < trusted_before_ns:
+                dir_mtimes[relative_dir] = dir_mtime
+            subdirs.setdefault(os.path.dirname(relative_dir), []).append(relative_dir)
+        
+        files = {}
+        for relative_path in previous[category]["paths"]:
+            files.setdefault(os.path.dirname(relative_path), []).append(relative_path)
+        
+        return {"dir_mtimes": dir_mtimes, "subdirs": subdirs, "files": files}
+    
+    @staticmethod
+    def _to_columns(file_entries: List[Tuple[str, int, int]]) -> Dict[str, list]:
+        """Turn (path, mtime, size) entries into parallel arrays sorted by path."""
+        file_entries.sort()
+        return {
+            "paths": [entry[0] for entry in file_entries],
+            "mtimes": [entry[1] for entry in file_entries],
+            "sizes": [entry[2] for entry in file_entries],
         }
+    
+    def _get_current_baseline(self, previous: Optional[Dict] = None) -> Dict:
+        """
+        Get current file baseline for all monitored paths.
+        Each category is stored column-wise: a sorted "paths" list with
+        parallel "mtimes" and "sizes" lists (plus "hashes" once hashed).
+        Files that don't exist are simply absent. Passing the previous baseline
+        lets unchanged directories skip being re-listed. The monitored
+        directories are scanned concurrently, as os.scandir/os.stat release the GIL.
+        """
+        source_entries = []
+        data_entries = []
+        config_entries = []
+        dir_mtimes = {}
         
-        # Scan source directories
+        # (entries list, directory, extensions, previous listing, ignore rules) per monitored directory
+        directory_scans = []
+        
+        # Source directories: focus on source code extensions, minus git-ignored files
+        # (data directories are often git-ignored as a whole, so they aren't filtered)
+        source_listing = self._previous_listing(previous, "source_files")
         for path in self.source_paths:
             if path.is_dir():
-                # Focus on source code extensions for source directories
-                extensions = ['.py', '.js', '.html', '.css', '.java', '.xml', '.json']
-                baseline["source_files"].update(self._scan_directory(path, extensions))
+                directory_scans.append((source_entries, path, SOURCE_EXTENSIONS, source_listing, self._ignore_spec))
             elif path.is_file():
-                relative_path = str(path.relative_to(self.project_root))
-                baseline["source_files"][relative_path] = self._get_file_info(path)
+                info = self._get_file_info(path)
+                if info:
+                    source_entries.append((str(path.relative_to(self.project_root)), *info))
         
-        # Scan data directories  
+        # Data directories: focus on data file extensions
+        data_listing = self._previous_listing(previous, "data_files")
         for path in self.data_paths:
             if path.is_dir():
-                # Focus on data file extensions
-                extensions = ['.gpx', '.pkl', '.pmtiles', '.json', '.geojson']
-                baseline["data_files"].update(self._scan_directory(path, extensions))
+                directory_scans.append((data_entries, path, DATA_EXTENSIONS, data_listing, None))
             elif path.is_file():
-                relative_path = str(path.relative_to(self.project_root))
-                baseline["data_files"][relative_path] = self._get_file_info(path)
+                info = self._get_file_info(path)
+                if info:
+                    data_entries.append((str(path.relative_to(self.project_root)), *info))
         
         # Scan config files
         for path in self.config_paths:
-            if path.exists():
-                relative_path = str(path.relative_to(self.project_root))
-                baseline["config_files"][relative_path] = self._get_file_info(path)
+            info = self._get_file_info(path)
+            if info:
+                config_entries.append((str(path.relative_to(self.project_root)), *info))
+        
+        # Scan the directories; each task gets its own result containers
+        max_workers = max(1, min(self.max_workers, len(directory_scans)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            scans = []
+            for entries, path, extensions, listing, ignore_spec in directory_scans:
+                scan_dir_mtimes = {}
+                future = executor.submit(self._scan_directory, path, extensions, None, scan_dir_mtimes,
+                                         listing, ignore_spec)
+                scans.append((entries, scan_dir_mtimes, future))
+            
+            for entries, scan_dir_mtimes, future in scans:
+                entries.extend(future.result())
+                dir_mtimes.update(scan_dir_mtimes)
+        
+        return {
+            "version": BASELINE_VERSION,
+            "timestamp": time.time(),
+            "source_files": self._to_columns(source_entries),
+            "data_files": self._to_columns(data_entries),
+            "config_files": self._to_columns(config_entries),
+            "dir_mtimes": dir_mtimes,
+            "ignore_rules": self._ignore_rules_stamp,
+        }
+    
+    def _get_current_baseline_cached(self, previous: Optional[Dict] = None) -> Dict:
+        """
+        _get_current_baseline(), reusing a scan started less than
+        BASELINE_CACHE_TTL_S ago (e.g. update_baseline() straight after a check)
+        unless the filesystem watcher has reported changes since.
+        """
+        if self._baseline_cache is not None and not any(self._dirty.values()):
+            scanned_at, baseline = self._baseline_cache
+            if time.monotonic() - scanned_at < BASELINE_CACHE_TTL_S:
+                return baseline
         
+        scanned_at = time.monotonic()
+        baseline = self._get_current_baseline(previous)
+        self._baseline_cache = (scanned_at, baseline)
         return baseline
     
     def _load_baseline(self) -> Optional[Dict]:
-        """Load previous baseline from cache."""
+        """Load previous baseline from cache; baselines in an older layout are ignored."""
         try:
             if self.baseline_file.exists():
-                with open(self.baseline_file, 'r') as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, OSError) as e:
+                with open(self.baseline_file, 'rb') as f:
+                    baseline = pickle.load(f)
+                if isinstance(baseline, dict) and baseline.get("version") == BASELINE_VERSION:
+                    return baseline
+        except (pickle.UnpicklingError, EOFError, ValueError, OSError) as e:
             print(f"Warning: Could not load baseline: {e}")
         return None
     
     def _save_baseline(self, baseline: Dict):
-        """Save baseline to cache."""
+        """
+        Save baseline to cache (pickled; it is only ever read back by this class).
+        Written to a temporary file and renamed into place, so an interrupted
+        save never leaves a truncated baseline that would force a full rebuild.
+        """
+        tmp_file = self.baseline_file.with_suffix('.tmp')
         try:
-            with open(self.baseline_file, 'w') as f:
-                json.dump(baseline, f, indent=2)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(baseline, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.baseline_file)
+            # Drop any JSON baseline left behind by older runs
+            if self.legacy_baseline_file.exists():
+                self.legacy_baseline_file.unlink()
         except OSError as e:
             print(f"Warning: Could not save baseline: {e}")
     
-    def _compare_baselines(self, old_baseline: Dict, new_baseline: Dict) -> Tuple[List[str], ChangeType]:
-        """Compare baselines and return changed files and change type."""
-        changed_files = []
-        change_types = set()
+    def _content_hash(self, relative_path: str) -> Optional[str]:
+        """BLAKE2b digest of a file's contents, or None if it can't be read."""
+        import hashlib  # Only needed in 'checksum'/'both' modes
         
-        # Check each category
-        for category in ["source_files", "data_files", "config_files"]:
-            old_files = old_baseline.get(category, {})
-            new_files = new_baseline.get(category, {})
-            
-            # Find changed, added, or removed files
-            all_files = set(old_files.keys()) | set(new_files.keys())
-            
-            for file_path in all_files:
-                old_info = old_files.get(file_path, {"exists": False})
-                new_info = new_files.get(file_path, {"exists": False})
-                
-                # Check if file changed
-                if (old_info.get("exists") != new_info.get("exists") or
-                    old_info.get("mtime", 0) != new_info.get("mtime", 0) or
-                    old_info.get("size", 0) != new_info.get("size", 0)):
-                    
-                    changed_files.append(file_path)
-                    
-                    if category == "source_files":
-                        change_types.add(ChangeType.SOURCE)
-                    elif category == "data_files":
-                        change_types.add(ChangeType.DATA)
-                    elif category == "config_files":
-                        change_types.add(ChangeType.CONFIG)
-        
-        # Determine primary change type
-        if ChangeType.SOURCE in change_types:
-            primary_change_type = ChangeType.SOURCE
-        elif ChangeType.DATA in change_types:
-            primary_change_type = ChangeType.DATA
-        elif ChangeType.CONFIG in change_types:
-            primary_change_type = ChangeType.CONFIG
+        digest = hashlib.blake2b()
+        try:
+            with open(self.project_root / relative_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+    
+    def _file_changed(self, file_path: str, old_mtime: int, old_size: int, old_hash: Optional[str],
+                      new_mtime: int, new_size: int) -> bool:
+        """
+        Decide whether a file present in both baselines changed.
+        mtime + size is the primary check; contents are only hashed in
+        'checksum' mode, or in 'both' mode when the size matches but the mtime
+        doesn't (e.g. files restored by CI with fresh timestamps).
+        """
+        if old_size != new_size:
+            return True
+        
+        mtime_changed = old_mtime != new_mtime
+        if not mtime_changed and self.algorithm != 'checksum':
+            return False  # mtime and size match - trust them
+        
+        if self.algorithm in ('checksum', 'both') and old_hash:
+            return self._content_hash(file_path) != old_hash
+        return mtime_changed
+    
+    def _iter_category_changes(self, old_files: Dict[str, list], new_files: Dict[str, list]) -> Iterator[str]:
+        """
+        Yield changed paths within one baseline category.
+        Both path lists are sorted, so one merge walk pairs up the parallel
+        arrays; added and removed files always count as changed.
+        """
+        old_paths, old_mtimes, old_sizes = old_files["paths"], old_files["mtimes"], old_files["sizes"]
+        new_paths, new_mtimes, new_sizes = new_files["paths"], new_files["mtimes"], new_files["sizes"]
+        old_hashes = old_files.get("hashes") or [None] * len(old_paths)
+        
+        if old_paths == new_paths and self.algorithm != 'checksum':
+            # Same file set (the usual case). Whole-list equality runs in C, so an
+            # untouched category costs no per-file Python work; otherwise only
+            # files whose mtime or size moved get a closer look.
+            if old_mtimes == new_mtimes and old_sizes == new_sizes:
+                return
+            for index, (old_mtime, new_mtime, old_size, new_size) in enumerate(
+                    zip(old_mtimes, new_mtimes, old_sizes, new_sizes)):
+                if (old_mtime != new_mtime or old_size != new_size) and self._file_changed(
+                        old_paths[index], old_mtime, old_size, old_hashes[index], new_mtime, new_size):
+                    yield old_paths[index]
+            return
+        
+        i = j = 0
+        while i < len(old_paths) and j < len(new_paths):
+            old_path, new_path = old_paths[i], new_paths[j]
+            if old_path == new_path:
+                if self._file_changed(old_path, old_mtimes[i], old_sizes[i], old_hashes[i],
+                                      new_mtimes[j], new_sizes[j]):
+                    yield old_path
+                i += 1
+                j += 1
+            elif old_path < new_path:
+                yield old_path  # Removed
+                i += 1
+            else:
+                yield new_path  # Added
+                j += 1
+        
+        yield from old_paths[i:]
+        yield from new_paths[j:]
+    
+    def _iter_changes(self, old_baseline: Dict, new_baseline: Dict,
+                      categories: Iterable[str] = CATEGORIES) -> Iterator[Tuple[str, str]]:
+        """Yield (category, path) for each changed file, lazily (callers may stop early)."""
+        for category in categories:
+            for file_path in self._iter_category_changes(old_baseline[category], new_baseline[category]):
+                yield category, file_path
+    
+    def _compare_baselines(self, old_baseline: Dict, new_baseline: Dict) -> Tuple[Dict[str, List[str]], ChangeType]:
+        """Compare baselines and return changed files per category and change type."""
+        changed_by_category = {category: [] for category in CATEGORIES}
+        for category, file_path in self._iter_changes(old_baseline, new_baseline):
+            changed_by_category[category].append(file_path)
+        return changed_by_category, self._primary_change_type(changed_by_category)
+    
+    @staticmethod
+    def _primary_change_type(changed_by_category: Dict[str, List[str]]) -> ChangeType:
+        """Most significant category with changes: source, then data, then config."""
+        if changed_by_category["source_files"]:
+            return ChangeType.SOURCE
+        elif changed_by_category["data_files"]:
+            return ChangeType.DATA
+        elif changed_by_category["config_files"]:
+            return ChangeType.CONFIG
+        return ChangeType.UNKNOWN
+    
+    def _ensure_diff(self) -> Dict:
+        """
+        Load the saved baseline, scan the current tree and compare them, once.
+        Later calls reuse the result until invalidate_cache() is called.
+        """
+        if self._diff is not None:
+            return self._diff
+        
+        old_baseline, new_baseline = self._get_baselines()
+        
+        if not old_baseline:
+            # No baseline means assume changes
+            diff = {
+                "has_baseline": False,
+                "changed_files": [],
+                "change_type": ChangeType.UNKNOWN,
+                "source_changed": True,
+                "data_changed": True,
+            }
         else:
-            primary_change_type = ChangeType.UNKNOWN
+            changed_by_category, change_type = self._compare_baselines(old_baseline, new_baseline)
+            diff = {
+                "has_baseline": True,
+                "changed_by_category": changed_by_category,
+                "changed_files": [path for paths in changed_by_category.values() for path in paths],
+                "change_type": change_type,
+                "source_changed": bool(changed_by_category["source_files"]),
+                "data_changed": bool(changed_by_category["data_files"]),
+            }
         
-        return changed_files, primary_change_type
+        self._diff = diff
+        return diff
+    
+    def _get_baselines(self) -> Tuple[Optional[Dict], Dict]:
+        """
+        The saved baseline (None if there is none) and the current one.
+        Loaded and scanned once; later calls reuse them until invalidate_cache().
+        """
+        if self._baselines is None:
+            old_baseline = self._load_baseline()
+            self._baselines = (old_baseline, self._get_current_baseline_cached(old_baseline))
+            self._old_baseline = old_baseline
+        return self._baselines
+    
+    def _category_changed(self, category: str) -> bool:
+        """
+        Whether anything in one category changed since the baseline.
+        Unless the full diff is already known, this stops at the first changed
+        file, sparing the remaining content hashes in 'checksum'/'both' modes.
+        """
+        if self._dirty[category]:
+            return True  # Reported by the filesystem watcher
+        
+        if self._diff is not None:
+            return not self._diff["has_baseline"] or bool(self._diff["changed_by_category"][category])
+        
+        if category not in self._category_changes:
+            old_baseline, new_baseline = self._get_baselines()
+            self._category_changes[category] = (
+                not old_baseline
+                or next(self._iter_changes(old_baseline, new_baseline, (category,)), None) is not None
+            )
+        return self._category_changes[category]
+    
+    def invalidate_cache(self):
+        """Forget the cached baselines so the next check rescans the tree."""
+        self._old_baseline = None
+        self._baseline_cache = None
+        self._baselines = None
+        self._diff = None
+        self._category_changes.clear()
+    
+    def _current_diff(self) -> Dict:
+        """_ensure_diff(), plus any changes the filesystem watcher reported since."""
+        diff = self._ensure_diff()
+        if not diff["has_baseline"] or not any(self._dirty.values()):
+            return diff
+        
+        changed_by_category = {}
+        for category in CATEGORIES:
+            changed = diff["changed_by_category"][category]
+            seen = set(changed)
+            changed_by_category[category] = changed + sorted(set(self._dirty[category]) - seen)
+        
+        return {
+            "has_baseline": True,
+            "changed_by_category": changed_by_category,
+            "changed_files": [path for paths in changed_by_category.values() for path in paths],
+            "change_type": self._primary_change_type(changed_by_category),
+            "source_changed": bool(changed_by_category["source_files"]),
+            "data_changed": bool(changed_by_category["data_files"]),
+        }
+    
+    def _watched_category(self, path: str, is_directory: bool) -> Optional[str]:
+        """Category a filesystem event path belongs to, or None if it isn't monitored."""
+        relative_path = os.path.relpath(path, self.project_root)
+        if any(part.startswith('.') or part in SKIPPED_DIR_NAMES for part in relative_path.split(os.sep)):
+            return None
+        
+        for category, paths, extensions in (
+            ("source_files", self.source_paths, SOURCE_EXTENSIONS),
+            ("data_files", self.data_paths, DATA_EXTENSIONS),
+            ("config_files", self.config_paths, None),
+        ):
+            for monitored in paths:
+                monitored_path = os.path.relpath(monitored, self.project_root)
+                if relative_path == monitored_path:
+                    return category
+                if is_directory:
+                    # Anything inside a monitored directory, or an ancestor of one
+                    if monitored_path.startswith(relative_path + os.sep):
+                        return category
+                    inside = relative_path.startswith(monitored_path + os.sep)
+                else:
+                    inside = bool(extensions) and relative_path.startswith(monitored_path + os.sep) \
+                        and os.path.splitext(relative_path)[1].lower() in extensions
+                
+                if inside:
+                    # Source scans leave out git-ignored paths, so their events don't count either
+                    if category == "source_files" and self._ignore_spec is not None and \
+                            self._ignore_spec.match_file(relative_path + '/' if is_directory else relative_path):
+                        return None
+                    return category
+        return None
+    
+    def start_watching(self) -> bool:
+        """
+        Track changes with filesystem events (watchdog) instead of rescanning.
+        After one comparison against the baseline, has_source_changed() and
+        has_data_changed() only look at the paths reported since. Returns False,
+        keeping the scanning behaviour, if watchdog isn't installed.
+        """
+        if self._observer is not None:
+            return True
+        
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            print("Note: watchdog not available - change detection will rescan the tree")
+            return False
+        
+        detector = self
+        
+        class DirtyPathHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Directory modifications just echo the file events inside them
+                if event.is_directory and event.event_type == 'modified':
+                    return
+                for path in (event.src_path, getattr(event, 'dest_path', None)):
+                    if not path:
+                        continue
+                    category = detector._watched_category(os.fsdecode(path), event.is_directory)
+                    if category:
+                        detector._dirty[category].add(os.path.relpath(os.fsdecode(path), detector.project_root))
+        
+        # Directories are watched recursively; single files (and directories that
+        # don't exist yet) through their nearest existing parent
+        recursive_roots = set()
+        flat_roots = set()
+        for path in self.source_paths + self.data_paths + self.config_paths:
+            if path.is_dir():
+                recursive_roots.add(path)
+                continue
+            parent = path.parent
+            while not parent.exists() and parent != self.project_root:
+                parent = parent.parent
+            flat_roots.add(parent)
+        
+        observer = Observer()
+        handler = DirtyPathHandler()
+        for root in recursive_roots:
+            observer.schedule(handler, os.fspath(root), recursive=True)
+        for root in flat_roots - recursive_roots:
+            observer.schedule(handler, os.fspath(root), recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        
+        self._ensure_diff()  # Changes made before watching started
+        return True
+    
+    def stop_watching(self):
+        """Stop the filesystem watcher started by start_watching()."""
+        if self._observer is None:
+            return
+        self._observer.stop()
+        self._observer.join()
+        self._observer = None
+        for dirty_paths in self._dirty.values():
+            dirty_paths.clear()
     
     def has_source_changed(self) -> bool:
         """Check if source code files have changed since last baseline."""
         try:
-            old_baseline = self._load_baseline()
-            if not old_baseline:
-                return True  # No baseline means assume changes
-            
-            new_baseline = self._get_current_baseline()
-            changed_files, change_type = self._compare_baselines(old_baseline, new_baseline)
-            
-            # Return True if any source files changed
-            return change_type == ChangeType.SOURCE or any(
-                file_path in new_baseline.get("source_files", {}) 
-                for file_path in changed_files
-            )
+            return self._category_changed("source_files")
         except Exception as e:
             print(f"Warning: Source change detection failed: {e}")
             return True  # Assume changes on error
@@ -244,29 +696,19 @@ class ChangeDetector:
     def has_data_changed(self) -> bool:
         """Check if data files have changed since last baseline."""
         try:
-            old_baseline = self._load_baseline()
-            if not old_baseline:
-                return True  # No baseline means assume changes
-            
-            new_baseline = self._get_current_baseline()
-            changed_files, change_type = self._compare_baselines(old_baseline, new_baseline)
-            
-            # Return True if any data files changed
-            return change_type == ChangeType.DATA or any(
-                file_path in new_baseline.get("data_files", {})
-                for file_path in changed_files
-            )
+            return self._category_changed("data_files")
         except Exception as e:
             print(f"Warning: Data change detection failed: {e}")
             return True  # Assume changes on error
     
     def get_change_report(self) -> ChangeReport:
         """Get comprehensive change report with optimization recommendations."""
+        from datetime import datetime  # Only needed to build the report
+        
         try:
-            old_baseline = self._load_baseline()
-            new_baseline = self._get_current_baseline()
+            diff = self._current_diff()
             
-            if not old_baseline:
+            if not diff["has_baseline"]:
                 # No baseline - assume all changes
                 return ChangeReport(
                     has_changes=True,
@@ -277,28 +719,18 @@ class ChangeDetector:
                     skip_data=False
                 )
             
-            changed_files, change_type = self._compare_baselines(old_baseline, new_baseline)
+            changed_files = diff["changed_files"]
             
             # Convert file paths to Path objects
             changed_paths = [Path(self.project_root / file_path) for file_path in changed_files]
             
-            # Determine optimization recommendations
-            source_changed = any(
-                file_path in new_baseline.get("source_files", {})
-                for file_path in changed_files
-            )
-            data_changed = any(
-                file_path in new_baseline.get("data_files", {})
-                for file_path in changed_files
-            )
-            
             return ChangeReport(
                 has_changes=bool(changed_files),
                 changed_files=changed_paths,
-                change_type=change_type,
-                baseline_time=datetime.fromtimestamp(old_baseline.get("timestamp", 0)),
-                skip_build=not source_changed,
-                skip_data=not data_changed
+                change_type=diff["change_type"],
+                baseline_time=datetime.fromtimestamp(self._old_baseline.get("timestamp", 0)),
+                skip_build=not diff["source_changed"],
+                skip_data=not diff["data_changed"]
             )
         except Exception as e:
             print(f"Warning: Change report generation failed: {e}")
@@ -358,7 +790,7 @@ class ChangeDetector:
             apk_exists = cached_apk_path.exists()
             pmtiles_exists = cached_pmtiles_path.exists()
             
-            # Check for changes
+            # Check for changes (one scan shared by both checks)
             source_changed = self.has_source_changed()
             data_changed = self.has_data_changed()
             
@@ -383,8 +815,18 @@ class ChangeDetector:
     def update_baseline(self):
         """Update the baseline with current file states."""
         try:
-            new_baseline = self._get_current_baseline()
+            new_baseline = self._get_current_baseline_cached(self._old_baseline or self._load_baseline())
+            # invalidate_cache() below makes the next check rescan, which covers
+            # anything the watcher reports in between
+            for dirty_paths in self._dirty.values():
+                dirty_paths.clear()
+            if self.algorithm in ('checksum', 'both'):
+                # Record content hashes so later comparisons can fall back to them
+                for category in CATEGORIES:
+                    files = new_baseline[category]
+                    files["hashes"] = [self._content_hash(file_path) for file_path in files["paths"]]
             self._save_baseline(new_baseline)
+            self.invalidate_cache()
             print(f"✅ Change detection baseline updated")
         except Exception as e:
             print(f"Warning: Could not update baseline: {e}")
@@ -392,9 +834,14 @@ class ChangeDetector:
     def reset_baseline(self):
         """Reset the baseline cache (force full rebuild on next run)."""
         try:
-            if self.baseline_file.exists():
-                self.baseline_file.unlink()
+            removed = False
+            for baseline_file in (self.baseline_file, self.legacy_baseline_file):
+                if baseline_file.exists():
+                    baseline_file.unlink()
+                    removed = True
+            if removed:
                 print("✅ Change detection baseline reset")
+            self.invalidate_cache()
         except Exception as e:
             print(f"Warning: Could not reset baseline: {e}")
 
@@ -1,12 +1,24 @@
 import os
 from pathlib import Path
+from types import MappingProxyType
 from dotenv import load_dotenv
 
-load_dotenv()
-
 # Paths - define at module level for easy access
 PROJECT_ROOT = Path(__file__).parent.parent
 
+# Load .env from its known locations rather than letting dotenv search upwards for it
+for _env_file in (Path(__file__).parent / ".env", PROJECT_ROOT / ".env"):
+    if _env_file.is_file():
+        load_dotenv(_env_file)
+        break
+
+
+def _env_bool(name, default):
+    """Read a 'true'/'false' environment flag, falling back to default when unset."""
+    value = os.environ.get(name)
+    return default if value is None else value.lower() == 'true'
+
+
 class TestConfig:
     # Paths
     PROJECT_ROOT = PROJECT_ROOT
@@ -16,8 +28,8 @@ class TestConfig:
     # Appium settings
     APPIUM_SERVER = os.getenv('APPIUM_SERVER', 'http://localhost:4723/wd/hub')
     
-    # Device capabilities using Appium 2.x format
-    ANDROID_CAPABILITIES = {
+    # Device capabilities using Appium 2.x format (read-only; copy before modifying)
+    ANDROID_CAPABILITIES = MappingProxyType({
         'platformName': 'Android',
         'appium:automationName': 'UiAutomator2',
         'appium:deviceName': os.getenv('DEVICE_NAME', 'Android Emulator'),
@@ -32,7 +44,7 @@ class TestConfig:
         # Important for hybrid apps
         'appium:autoWebview': False,  # We'll switch contexts manually
         'appium:webviewDevtoolsPort': 9222,
-    }
+    })
     
     # Test settings
     IMPLICIT_WAIT = 10
@@ -49,9 +61,9 @@ class TestConfig:
     # Optimization settings
     class OptimizationConfig:
         # Cache settings
-        ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
+        ENABLE_CACHING = _env_bool('ENABLE_CACHING', True)
         CACHE_TTL_HOURS = int(os.getenv('CACHE_TTL_HOURS', '24'))  # Cache validity in hours
-        AUTO_CACHE_CLEANUP = os.getenv('AUTO_CACHE_CLEANUP', 'true').lower() == 'true'
+        AUTO_CACHE_CLEANUP = _env_bool('AUTO_CACHE_CLEANUP', True)
         
         # Build optimization
         SKIP_APK_BUILD_ON_NO_CHANGES = True
@@ -59,7 +71,7 @@ class TestConfig:
         FORCE_REBUILD_ON_CACHE_CORRUPTION = True
         
         # Parallel execution settings
-        ENABLE_PARALLEL_EXECUTION = os.getenv('ENABLE_PARALLEL_EXECUTION', 'true').lower() == 'true'
+        ENABLE_PARALLEL_EXECUTION = _env_bool('ENABLE_PARALLEL_EXECUTION', True)
         MAX_PARALLEL_WORKERS = int(os.getenv('MAX_PARALLEL_WORKERS', '4'))
         PARALLEL_TIMEOUT_MULTIPLIER = float(os.getenv('PARALLEL_TIMEOUT_MULTIPLIER', '1.5'))
         SEQUENTIAL_FALLBACK_ON_FAILURE = True
@@ -72,9 +84,9 @@ class TestConfig:
         MAX_SERVICE_RESTART_ATTEMPTS = int(os.getenv('MAX_SERVICE_RESTART_ATTEMPTS', '3'))
         
         # Performance monitoring
-        ENABLE_PERFORMANCE_MONITORING = os.getenv('ENABLE_PERFORMANCE_MONITORING', 'true').lower() == 'true'
+        ENABLE_PERFORMANCE_MONITORING = _env_bool('ENABLE_PERFORMANCE_MONITORING', True)
         PERFORMANCE_REPORT_FORMAT = os.getenv('PERFORMANCE_REPORT_FORMAT', 'json')  # json, csv, both
-        DETAILED_TIMING_METRICS = os.getenv('DETAILED_TIMING_METRICS', 'true').lower() == 'true'
+        DETAILED_TIMING_METRICS = _env_bool('DETAILED_TIMING_METRICS', True)
         
         # Change detection settings
         CHANGE_DETECTION_ALGORITHM = os.getenv('CHANGE_DETECTION_ALGORITHM', 'mtime')  # mtime, checksum, both
@@ -89,9 +101,9 @@ class TestConfig:
         SERVICE_STATE_CACHE_DIR = PROJECT_ROOT / "testing" / ".service_cache"
         
         # Persistent infrastructure settings
-        PERSISTENT_INFRASTRUCTURE_ENABLED = os.getenv('PERSISTENT_INFRASTRUCTURE_ENABLED', 'false').lower() == 'true'
-        AUTO_START_PERSISTENT_SERVICES = os.getenv('AUTO_START_PERSISTENT_SERVICES', 'false').lower() == 'true'
-        PERSISTENT_SERVICE_AUTO_RESTART = os.getenv('PERSISTENT_SERVICE_AUTO_RESTART', 'true').lower() == 'true'
+        PERSISTENT_INFRASTRUCTURE_ENABLED = _env_bool('PERSISTENT_INFRASTRUCTURE_ENABLED', False)
+        AUTO_START_PERSISTENT_SERVICES = _env_bool('AUTO_START_PERSISTENT_SERVICES', False)
+        PERSISTENT_SERVICE_AUTO_RESTART = _env_bool('PERSISTENT_SERVICE_AUTO_RESTART', True)
         
     # Legacy support - maintain backward compatibility
     OPTIMIZATION = OptimizationConfig()
\ No newline at end of file
@@ -2,15 +2,22 @@
 pytest fixtures for GPX to mobile testing
 Session-scoped fixtures handle expensive operations once per test session
 """
+import hashlib
 import os
 import sys
 import pytest
 import shutil
 import subprocess
 import tempfile
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-import pytest_html
+from urllib.parse import urlsplit
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not shared between workers there
+    fcntl = None
 
 # Modularized cleanup utilities for reuse across scripts
 def cleanup_test_environment(test_env_path):
@@ -73,6 +80,181 @@ def cleanup_emulator_state():
     except Exception as e:
         print(f"⚠️ Emulator state cleanup warning: {e}")
 
+def run_mobile_build(cmd, cwd, env, log_path=None, timeout=600):
+    """
+    Run build_mobile.py non-interactively and return its exit code.
+    Output is echoed line by line as the build runs (and appended to log_path,
+    if given) instead of being held in memory until it finishes; the build is
+    killed if it exceeds timeout seconds.
+    """
+    build_process = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=env,
+    )
+    timer = threading.Timer(timeout, build_process.kill)
+    timer.start()
+    try:
+        # Automatically answer "y" to any prompts
+        try:
+            build_process.stdin.write("y\ny\n")
+            build_process.stdin.close()
+        except BrokenPipeError:
+            pass  # Build exited before reading its prompts
+        
+        with open(log_path or os.devnull, "a") as log_file:
+            for line in build_process.stdout:
+                log_file.write(line)
+                print(line, end="")
+        build_process.wait()
+    finally:
+        timer.cancel()
+    
+    if build_process.returncode < 0:
+        print(f"   ⏰ Mobile APK build was stopped after {timeout}s")
+    return build_process.returncode
+
+# Linux ioctl that makes dst share src's data blocks (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+def clone_file(src, dst):
+    """
+    Copy src to dst like shutil.copy2, but as a copy-on-write clone when the
+    filesystem supports it, so no file data is read or written.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass  # Not supported here (or across filesystems); copy the bytes
+    return shutil.copy2(src, dst)
+
+def link_or_copy(src, dst):
+    """
+    Hard-link src to dst, falling back to a symlink when they're on different
+    filesystems (e.g. a tmpfs /tmp), and to a copy if that fails too.
+    Only for inputs the build reads but never writes: a link shares the
+    original file's contents, so an in-place edit would change the source too.
+    Python scripts are never symlinked, since Python puts a symlinked script's
+    real directory on sys.path and would import modules from the repo instead.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    if Path(src).suffix != ".py":
+        try:
+            os.symlink(Path(src).resolve(), dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+# Build outputs kept per input digest, so unchanged inputs never rebuild the APK
+INPUT_KEYED_ARTIFACTS = ("app-debug.apk", "runs.pmtiles", "runs.pkl")
+MAX_INPUT_KEYED_BUILDS = 5
+
+def build_inputs_digest(root, extra=()):
+    """
+    SHA-256 over every file under root (relative path and contents) plus the
+    extra strings, identifying the exact inputs of a test APK build.
+    """
+    root = Path(root)
+    digest = hashlib.sha256()
+    for value in extra:
+        digest.update(value.encode() + b"\0")
+    # os.walk follows symlinked directories (e.g. node_modules/rbush), which rglob skips
+    files = [Path(dirpath) / name
+             for dirpath, _, filenames in os.walk(root, followlinks=True)
+             for name in filenames]
+    for path in sorted(p for p in files if p.is_file()):
+        digest.update(path.relative_to(root).as_posix().encode() + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+@lru_cache(maxsize=None)
+def build_toolchain_fingerprint(project_root):
+    """
+    Strings identifying the toolchain build_mobile.py builds the APK with, for
+    build_inputs_digest's extra: node/npm and JDK versions, the JDK and Android
+    SDK locations, and the npm lockfile and Gradle user properties, if present.
+    Looked up once per process, since running the tools takes a moment.
+    """
+    fingerprint = [f"{name}={os.environ.get(name)}" for name in ("JAVA_HOME", "ANDROID_HOME", "ANDROID_SDK_ROOT")]
+    for cmd in (["node", "--version"], ["npm", "--version"], ["java", "-version"]):
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            version = (result.stdout + result.stderr).strip()  # java prints to stderr
+        except (OSError, subprocess.TimeoutExpired):
+            version = "unavailable"
+        fingerprint.append(f"{cmd[0]}={version}")
+    for config_file in (Path(project_root) / "package-lock.json", Path.home() / ".gradle" / "gradle.properties"):
+        if config_file.is_file():
+            fingerprint.append(f"{config_file.name}={hashlib.sha256(config_file.read_bytes()).hexdigest()}")
+    return tuple(fingerprint)
+
+def store_input_keyed_build(cache_root, digest, artifacts):
+    """
+    Save build artifacts ({file name: path}) under cache_root/digest, keeping
+    only the MAX_INPUT_KEYED_BUILDS most recent builds.
+    """
+    build_dir = cache_root / digest
+    build_dir.mkdir(parents=True, exist_ok=True)
+    for name, path in artifacts.items():
+        clone_file(path, build_dir / name)
+    
+    builds = sorted((p for p in cache_root.iterdir() if p.is_dir()),
+                    key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale_build in builds[MAX_INPUT_KEYED_BUILDS:]:
+        shutil.rmtree(stale_build, ignore_errors=True)
+
+def worker_device():
+    """
+    Return (serial, Appium server URL) for this pytest-xdist worker.
+    With ANDROID_SERIALS="emulator-5554,emulator-5556" worker gwN drives the
+    Nth device through an Appium server at APPIUM_SERVER's port + N (same
+    scheme, host and path); otherwise every worker shares the default device
+    and APPIUM_SERVER.
+    """
+    import config
+    
+    serials = [s.strip() for s in os.environ.get("ANDROID_SERIALS", "").split(",") if s.strip()]
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "")
+    if len(serials) < 2 or not worker.startswith("gw"):
+        return os.environ.get("ANDROID_SERIAL"), config.TestConfig.APPIUM_SERVER
+    index = int(worker[2:]) % len(serials)
+    server = urlsplit(config.TestConfig.APPIUM_SERVER)
+    port = server.port or (443 if server.scheme == "https" else 80)
+    netloc = f"{server.hostname}:{port + index}"
+    if ":" in server.hostname:
+        netloc = f"[{server.hostname}]:{port + index}"  # IPv6 literal
+    if server.username:
+        credentials = server.username + (f":{server.password}" if server.password else "")
+        netloc = f"{credentials}@{netloc}"
+    return serials[index], server._replace(netloc=netloc).geturl()
+
+def acquire_build_lock(cache_dir):
+    """
+    Block until this process holds the shared build lock and return its file.
+    Workers build one at a time, so later workers reuse the first one's
+    input-keyed build instead of rebuilding the same APK. Close the file to release.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    lock_file = open(cache_dir / "build.lock", "w")
+    if fcntl is not None:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+    return lock_file
+
 def cleanup_all_test_artifacts(package_name="com.run.heatmap", test_env_path=None, driver=None):
     """
     Comprehensive cleanup utility that combines all cleanup operations.
@@ -134,6 +316,11 @@ def configure_emulator_stability():
 def pytest_configure(config):
     # Stash the driver so sessionfinish can access it
     config._appium_driver_ref = {}
+    
+    # Point this worker's adb calls at its own device when sharding across emulators
+    serial, _ = worker_device()
+    if serial:
+        os.environ["ANDROID_SERIAL"] = serial
 
 def pytest_sessionfinish(session, exitstatus):
     # JS coverage is now collected per-test in mobile_driver fixture
@@ -295,18 +482,19 @@ def session_setup(fast_mode):
         raw_data_dir.mkdir(parents=True)
         
         # Copy essential server files
-        essential_files = [
+        essential_files = {
             "process_data.py", "build_mobile.py",
             "mobile_template.html", "mobile_main.js", "sw_template.js", 
             "spatial.worker.js", "AndroidManifest.xml.template", 
             "MainActivity.java.template", "HttpRangeServerPlugin.java.template",
             "network_security_config.xml.template"
-        ]
+        }
         
-        for file_name in essential_files:
-            src_file = project_root / "server" / file_name
-            if src_file.exists():
-                shutil.copy2(src_file, server_dir / file_name)
+        # One directory read finds whichever of them exist, instead of a stat per name
+        with os.scandir(project_root / "server") as entries:
+            for entry in entries:
+                if entry.name in essential_files and entry.is_file():
+                    link_or_copy(entry.path, server_dir / entry.name)
         
         # Copy .instrumented directory if it exists and instrumentation is enabled
         instrument_js = os.environ.get("INSTRUMENT_JS")
@@ -329,7 +517,7 @@ def session_setup(fast_mode):
                 print(f"      Destination: {dest_instrumented}")
                 
                 try:
-                    shutil.copytree(instrumented_dir, dest_instrumented)
+                    shutil.copytree(instrumented_dir, dest_instrumented, copy_function=clone_file)
                     copied_files = list(dest_instrumented.iterdir())
                     print(f"      ✅ Copied .instrumented directory: {len(copied_files)} files")
                     print(f"      Copied files:")
@@ -370,11 +558,15 @@ def session_setup(fast_mode):
             test_node_modules = test_env / "node_modules"
             test_node_modules.mkdir(exist_ok=True)
             
-            # Copy rbush module specifically
+            # Link rbush module specifically; the build only reads rbush.min.js from it
             rbush_module = node_modules / "rbush"
             if rbush_module.exists():
-                shutil.copytree(rbush_module, test_node_modules / "rbush")
-                print("   📦 Copied rbush dependency for mobile build")
+                try:
+                    os.symlink(rbush_module.resolve(), test_node_modules / "rbush", target_is_directory=True)
+                    print("   📦 Linked rbush dependency for mobile build")
+                except OSError:
+                    shutil.copytree(rbush_module, test_node_modules / "rbush", copy_function=clone_file)
+                    print("   📦 Copied rbush dependency for mobile build")
         
         # Copy essential directories
         essential_dirs = ["templates", "static"]
@@ -383,7 +575,7 @@ def session_setup(fast_mode):
             dest_dir = server_dir / dir_name
             if src_dir.exists():
                 if src_dir.is_dir():
-                    shutil.copytree(src_dir, dest_dir)
+                    shutil.copytree(src_dir, dest_dir, copy_function=clone_file)
                 else:
                     # It's a file
                     shutil.copy2(src_dir, dest_dir)
@@ -394,7 +586,7 @@ def session_setup(fast_mode):
             for gpx_file in test_data_dir.glob("*.gpx"):
                 # Skip manual_upload_run.gpx - it should only be available for manual upload testing
                 if gpx_file.name != "manual_upload_run.gpx":
-                    shutil.copy2(gpx_file, raw_data_dir / gpx_file.name)
+                    link_or_copy(gpx_file, raw_data_dir / gpx_file.name)
                     print(f"   📄 Including {gpx_file.name} in APK build")
                 else:
                     print(f"   ⏭️  Excluding {gpx_file.name} from APK (manual upload testing only)")
@@ -420,8 +612,34 @@ def session_setup(fast_mode):
                 print(f"   ⚠️  Warning: Could not install coverage: {e}")
                 print("   📝 Coverage will be skipped for subprocesses")
 
+        # Only one xdist worker builds or updates the shared caches at a time
+        build_lock = acquire_build_lock(project_root / "testing" / ".optimization_cache")
+        
+        # Reuse APK and data from an earlier build of byte-identical inputs, if any
+        input_keyed_cache = project_root / "testing" / ".optimization_cache" / "apks"
+        # The staged env already includes build_mobile.py and package.json
+        inputs_digest = build_inputs_digest(test_env, extra=(
+            f"COVERAGE_RUN={is_cov_run}", f"INSTRUMENT_JS={os.environ.get('INSTRUMENT_JS')}",
+            *build_toolchain_fingerprint(project_root)
+        ))
+        keyed_build_dir = input_keyed_cache / inputs_digest
+        reused_keyed_build = (need_apk_build or need_data_processing) and all(
+            (keyed_build_dir / name).exists() for name in INPUT_KEYED_ARTIFACTS
+        )
+        if reused_keyed_build:
+            print(f"   ⚡ Inputs unchanged since an earlier build ({inputs_digest[:12]}), reusing its APK and data")
+            clone_file(keyed_build_dir / "runs.pmtiles", server_dir / "runs.pmtiles")
+            clone_file(keyed_build_dir / "runs.pkl", server_dir / "runs.pkl")
+            apk_destination = test_env / "mobile/android/app/build/outputs/apk/debug"
+            apk_destination.mkdir(parents=True, exist_ok=True)
+            apk_path = apk_destination / "app-debug.apk"
+            clone_file(keyed_build_dir / "app-debug.apk", apk_path)
+            keyed_build_dir.touch()  # Keep recently used builds from being pruned
+
         # 2. Process test data (GPX import and PMTiles generation)
-        if need_data_processing:
+        if reused_keyed_build:
+            pass  # Data restored above
+        elif need_data_processing:
             print("   🗂️ Processing test data (GPX import and PMTiles generation)...")
             
             print("   🔄 Running consolidated data processing...")
@@ -448,8 +666,8 @@ def session_setup(fast_mode):
             cached_pkl_path = project_root / "testing" / "cached_test_data" / "runs.pkl"
 
             if cached_pmtiles_path.exists() and cached_pkl_path.exists():
-                shutil.copy2(cached_pmtiles_path, server_dir / "runs.pmtiles")
-                shutil.copy2(cached_pkl_path, server_dir / "runs.pkl")
+                clone_file(cached_pmtiles_path, server_dir / "runs.pmtiles")
+                clone_file(cached_pkl_path, server_dir / "runs.pkl")
                 print(f"   📋 Using cached PMTiles: {cached_pmtiles_path}")
                 print(f"   📦 Using cached PKL: {cached_pkl_path}")
             else:
@@ -475,7 +693,9 @@ def session_setup(fast_mode):
                 print("   ✅ Test data processing complete.")
         
         # 3. Build mobile APK with test data
-        if need_apk_build:
+        if reused_keyed_build:
+            pass  # APK restored above
+        elif need_apk_build:
             # Track APK build execution in debug file (bypass pytest buffering)
             with open(debug_file, "a") as f:
                 f.write(f"APK_BUILD_STARTING: need_apk_build={need_apk_build}\n")
@@ -503,24 +723,11 @@ def session_setup(fast_mode):
                 ])
             cmd.append("build_mobile.py")
 
-            build_process = subprocess.Popen(
-                cmd,
-                cwd=server_dir,  # IMPORTANT: build inside the isolated server dir
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                env=build_env,
-            )
-            
-            # Automatically answer "y" to any prompts
-            stdout, _ = build_process.communicate(input="y\ny\n", timeout=600)
-            
-            # Show the output
-            print(stdout)
+            # IMPORTANT: build inside the isolated server dir
+            returncode = run_mobile_build(cmd, server_dir, build_env, log_path=test_env / "build.log")
             
-            if build_process.returncode != 0:
-                raise Exception(f"Mobile APK build failed with return code {build_process.returncode}")
+            if returncode != 0:
+                raise Exception(f"Mobile APK build failed with return code {returncode}")
             
             print("   ✅ Mobile APK built successfully.")
             
@@ -534,7 +741,7 @@ def session_setup(fast_mode):
                 apk_destination = test_env / "mobile/android/app/build/outputs/apk/debug"
                 apk_destination.mkdir(parents=True, exist_ok=True)
                 apk_path = apk_destination / "app-debug.apk"
-                shutil.copy2(cached_apk_path, apk_path)
+                clone_file(cached_apk_path, apk_path)
                 print(f"   📋 Using cached APK: {cached_apk_path}")
             else:
                 print("   ⚠️ Warning: No cached APK found, falling back to build")
@@ -563,18 +770,10 @@ def session_setup(fast_mode):
                     ])
                 cmd.append("build_mobile.py")
 
-                build_process = subprocess.Popen(cmd, cwd=server_dir, stdin=subprocess.PIPE,
-                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-                   text=True, env=build_env)
-                
-                # Automatically answer "y" to any prompts
-                stdout, _ = build_process.communicate(input="y\ny\n", timeout=600)
-                
-                # Show the output
-                print(stdout)
+                returncode = run_mobile_build(cmd, server_dir, build_env, log_path=test_env / "build.log")
                 
-                if build_process.returncode != 0:
-                    raise Exception(f"Mobile APK build failed with return code {build_process.returncode}")
+                if returncode != 0:
+                    raise Exception(f"Mobile APK build failed with return code {returncode}")
                 
                 print("   ✅ Mobile APK built successfully.")
                 apk_path = test_env / "mobile/android/app/build/outputs/apk/debug/app-debug.apk"
@@ -585,15 +784,11 @@ def session_setup(fast_mode):
         if not apk_path.exists():
             raise Exception(f"APK not found at expected path: {apk_path}")
         
-        # Install APK
-        result = subprocess.run([
-            "adb", "install", "-r", str(apk_path)
-        ], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"APK installation failed: {result.stderr}")
-        
-        print("   ✅ Test APK installed successfully.")
+        # Install APK in the background; caching the artifacts below doesn't depend on it.
+        # An incremental install streams the APK on demand instead of pushing it all up front.
+        install_process = subprocess.Popen([
+            "adb", "install", "--incremental", "-r", str(apk_path)
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         
         # 5. Cache test APK and data for future optimization runs
         print("   💾 Caching test APK and data for future optimization runs...")
@@ -606,27 +801,37 @@ def session_setup(fast_mode):
             cached_data_dir.mkdir(parents=True, exist_ok=True)
             
             # Only cache APK if we built it (or needed to re-copy)
-            if need_apk_build or not (cached_apk_dir / "app-debug.apk").exists():
+            if need_apk_build or reused_keyed_build or not (cached_apk_dir / "app-debug.apk").exists():
                 cached_apk_path = cached_apk_dir / "app-debug.apk"
-                shutil.copy2(apk_path, cached_apk_path)
+                clone_file(apk_path, cached_apk_path)
                 print(f"   📱 Cached test APK: {cached_apk_path}")
             
             # Only cache PMTiles and runs.pkl if we processed data
-            if need_data_processing:
+            if need_data_processing or reused_keyed_build:
                 # Cache PMTiles
                 pmtiles_source = server_dir / "runs.pmtiles"
                 if pmtiles_source.exists():
                     cached_pmtiles_path = cached_data_dir / "runs.pmtiles"
-                    shutil.copy2(pmtiles_source, cached_pmtiles_path)
+                    clone_file(pmtiles_source, cached_pmtiles_path)
                     print(f"   🗺️ Cached PMTiles data: {cached_pmtiles_path}")
                 
                 # Cache runs.pkl
                 pkl_source = server_dir / "runs.pkl"
                 if pkl_source.exists():
                     cached_pkl_path = cached_data_dir / "runs.pkl"
-                    shutil.copy2(pkl_source, cached_pkl_path)
+                    clone_file(pkl_source, cached_pkl_path)
                     print(f"   📦 Cached PKL data: {cached_pkl_path}")
 
+            # Key freshly built artifacts by their inputs for future sessions
+            keyed_artifacts = {
+                "app-debug.apk": apk_path,
+                "runs.pmtiles": server_dir / "runs.pmtiles",
+                "runs.pkl": server_dir / "runs.pkl",
+            }
+            if need_apk_build and not reused_keyed_build and all(p.exists() for p in keyed_artifacts.values()):
+                store_input_keyed_build(input_keyed_cache, inputs_digest, keyed_artifacts)
+                print(f"   🔑 Stored build for inputs {inputs_digest[:12]}")
+
             print("   ✅ Test artifacts cached for optimization")
             
             # Update change detection baseline if we built or processed anything
@@ -639,6 +844,22 @@ def session_setup(fast_mode):
         except Exception as e:
             print(f"   ⚠️ Warning: Could not cache test artifacts: {e}")
         
+        build_lock.close()
+        
+        install_stdout, install_stderr = install_process.communicate()
+        install_returncode = install_process.returncode
+        if install_returncode != 0 and "incremental" in (install_stdout + install_stderr).lower():
+            # Older adb/devices, or an APK without a v4 signature: push the whole APK instead
+            print("   ⚠️ Incremental install unavailable, falling back to a full install")
+            install_result = subprocess.run([
+                "adb", "install", "-r", str(apk_path)
+            ], capture_output=True, text=True)
+            install_returncode, install_stderr = install_result.returncode, install_result.stderr
+        if install_returncode != 0:
+            raise Exception(f"APK installation failed: {install_stderr}")
+        
+        print("   ✅ Test APK installed successfully.")
+        
         # Provide session data to tests
         # Final instrumented files check
         with open(instr_debug_file, "a") as f:
@@ -673,6 +894,9 @@ def session_setup(fast_mode):
         yield session_data
         
     finally:
+        if 'build_lock' in locals():
+            build_lock.close()  # No-op if already released
+        
         # Before cleanup, preserve any coverage fragments from the isolated env
         try:
             project_root = Path(__file__).parent.parent
@@ -692,6 +916,24 @@ def session_setup(fast_mode):
         # Cleanup using modularized cleanup utility
         cleanup_test_environment(str(test_env))
 
+@lru_cache(maxsize=None)
+def get_driver_options(apk_path=None):
+    """
+    Build Appium UiAutomator2 options from the test config once per APK path.
+    Every test creates its own driver session, so this cache lets them share
+    the options object instead of rebuilding it from the capabilities each time.
+    """
+    from appium.options.android import UiAutomator2Options
+    import config
+    
+    capabilities = config.TestConfig.ANDROID_CAPABILITIES.copy()
+    if apk_path:
+        capabilities['appium:app'] = apk_path
+    serial, _ = worker_device()
+    if serial:
+        capabilities['appium:udid'] = serial
+    return UiAutomator2Options().load_capabilities(capabilities)
+
 @pytest.fixture(scope="function")
 def mobile_driver(request, session_setup):
     """
@@ -708,19 +950,17 @@ def mobile_driver(request, session_setup):
     # Configure emulator for deterministic behavior
     configure_emulator_stability()
     
-    # Use test config for capabilities
-    capabilities = config.TestConfig.ANDROID_CAPABILITIES.copy()
-    
-    # Use APK path from session setup (works for both fast and full mode)
-    if session_setup.get('apk_path'):
-        capabilities['appium:app'] = session_setup['apk_path']
+    # Test config capabilities, using the APK path from session setup
+    # (works for both fast and full mode)
+    options = get_driver_options(session_setup.get('apk_path'))
     
     # Create WebDriver instance using modern Appium options API
-    from appium.options.android import UiAutomator2Options
-    options = UiAutomator2Options().load_capabilities(capabilities)
+    # Reuse one pooled HTTP connection for every WebDriver command to Appium
+    _, appium_server = worker_device()
     driver = webdriver.Remote(
-        config.TestConfig.APPIUM_SERVER,
-        options=options
+        appium_server,
+        options=options,
+        keep_alive=True
     )
 
     # Stash driver for session-level cleanup and JS coverage
@@ -739,17 +979,16 @@ def mobile_driver(request, session_setup):
 
             # Ensure we inject into an actual WebView context
             print("🔎 Waiting for WebView context to start CSS coverage...")
-            webview_name = None
-            for _ in range(40):  # ~10s total (40 * 0.25s)
-                try:
-                    ctxs = driver.contexts
-                    webviews = [c for c in ctxs if c.startswith("WEBVIEW")]
-                    if webviews:
-                        webview_name = webviews[0]
-                        break
-                except Exception:
-                    pass
-                time.sleep(0.25)
+            from selenium.common.exceptions import TimeoutException, WebDriverException
+            try:
+                # Poll every 100ms for up to 10s, returning the first WebView
+                # as soon as it appears
+                webview_name = WebDriverWait(
+                    driver, 10, poll_frequency=0.1,
+                    ignored_exceptions=(WebDriverException,)
+                ).until(lambda d: next((c for c in d.contexts if c.startswith("WEBVIEW")), None))
+            except TimeoutException:
+                webview_name = None
 
             if webview_name:
                 prev_ctx = None
@@ -822,8 +1061,9 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
     
-    # Only process during the "call" phase (actual test execution)
-    if call.when != "call":
+    # Only process during the "call" phase (actual test execution), and only
+    # when an HTML report was requested with --html
+    if call.when != "call" or not getattr(item.config.option, "htmlpath", None):
         return
     
     # Initialize extras list if it doesn't exist - this is REQUIRED for pytest-html
@@ -12,6 +12,7 @@ These tests run first (00_ prefix) and prepare the infrastructure that
 functional tests depend on.
 """
 import pytest
+import subprocess
 import time
 from pathlib import Path
 
@@ -64,5 +65,17 @@ class TestInfrastructureSetup:
         print("   ✅ APK installed and ready for functional testing")
         print("🏗️ Infrastructure setup completed successfully!")
         
-        # Brief pause to ensure everything is settled
-        time.sleep(2)
\ No newline at end of file
+        # Wait until the package manager reports the app as installed instead
+        # of a fixed settle pause; returns on the first successful check
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                result = subprocess.run(
+                    ['adb', 'shell', 'pm', 'path', setup_info['package_name']],
+                    capture_output=True, text=True, timeout=5
+                )
+            except (OSError, subprocess.TimeoutExpired):
+                break
+            if result.stdout.startswith('package:'):
+                break
+            time.sleep(0.1)
\ No newline at end of file
@@ -21,14 +21,11 @@ class TestMobileAppWithTestData(BaseMobileTest):
         
         # Pan to exact test coordinates
         test_lat, test_lon = 39.4168, -77.4169
-        driver.execute_script(f"""
-            map.flyTo({{
-                center: [{test_lon}, {test_lat}],
-                zoom: 13,
-                duration: 1000
-            }});
-        """)
-        self.wait_for_map_idle_after_move(driver, timeout_ms=4000, verbose=True)
+        self.fly_and_wait_idle(driver, {
+            'center': [test_lon, test_lat],
+            'zoom': 13,
+            'duration': 1000
+        }, timeout_ms=4000, verbose=True)
         
         # Sample pixels along the expected route
         pixel_check = driver.execute_script("""
@@ -189,26 +186,6 @@ class TestMobileAppWithTestData(BaseMobileTest):
         
         return verification
     
-    def debug_rendering_state(self, driver):
-        """Get complete rendering state for debugging"""
-        return driver.execute_script("""
-            const canvas = map.getCanvas();
-            const gl = canvas.getContext('webgl') || canvas.getContext('webgl2');
-            
-            return {
-                mapLoaded: map.loaded(),
-                mapStyle: !!map.getStyle(),
-                canvasSize: {w: canvas.width, h: canvas.height},
-                webglContext: !!gl,
-                layers: map.getStyle().layers.map(l => ({
-                    id: l.id,
-                    type: l.type,
-                    visible: map.getLayoutProperty(l.id, 'visibility') !== 'none'
-                })),
-                sources: Object.keys(map.getStyle().sources)
-            };
-        """)
-    
     
     @pytest.mark.core  
     def test_activity_definitely_visible(self, mobile_driver):
@@ -219,7 +196,7 @@ class TestMobileAppWithTestData(BaseMobileTest):
         wait = mobile_driver['wait']
         
         # Setup and navigate to test area
-        self.wait_for_webview_available(driver, wait, verbose=True)
+        self.wait_for_webview_available(driver, verbose=True)
         self.switch_to_webview(driver)
         map_detector = MapLoadDetector(driver, wait, verbose=True)
         map_detector.wait_for_map_ready(timeout=30, min_tiles_threshold=1)
@@ -241,14 +218,11 @@ class TestMobileAppWithTestData(BaseMobileTest):
         # Step 2: Navigate to exact test location
         print("📋 Step 2: Navigating to test location...")
         test_lat, test_lon = 39.4168, -77.4169
-        driver.execute_script(f"""
-            map.flyTo({{
-                center: [{test_lon}, {test_lat}],
-                zoom: 13,
-                duration: 1500
-            }});
-        """)
-        self.wait_for_map_idle_after_move(driver, timeout_ms=5000, verbose=True)
+        self.fly_and_wait_idle(driver, {
+            'center': [test_lon, test_lat],
+            'zoom': 13,
+            'duration': 1500
+        }, timeout_ms=5000, verbose=True)
         
         # Step 3: Verify features are in viewport
         print("📋 Step 3: Verifying features in viewport...")
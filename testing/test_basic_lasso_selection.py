@@ -40,7 +40,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Setup - launch app and wait for initialization
         print("⏳ Waiting for app WebView to become available...")
-        self.wait_for_webview_available(driver, wait, verbose=True)
+        self.wait_for_webview_available(driver, verbose=True)
         
         print("🔄 Switching to WebView context...")
         self.switch_to_webview(driver)
@@ -87,16 +87,12 @@ class TestBasicLassoSelection(BaseMobileTest):
         zoom_level = 14
         
         print(f"🗺️ Navigating to Frederick activity: {frederick_lat}, {frederick_lon}")
-        driver.execute_script(f"""
-            // Use jumpTo for instant, deterministic positioning (no animation)
-            map.jumpTo({{
-                center: [{frederick_lon}, {frederick_lat}],
-                zoom: {zoom_level}
-            }});
-        """)
-        
-        # Wait for map to settle after navigation
-        self.wait_for_map_idle_after_move(driver, timeout_ms=5000, verbose=True)
+        # Use jumpTo for instant, deterministic positioning (no animation)
+        # and wait for map to settle after navigation
+        self.fly_and_wait_idle(driver, {
+            'center': [frederick_lon, frederick_lat],
+            'zoom': zoom_level
+        }, timeout_ms=5000, verbose=True, method='jumpTo')
         
         # Wait for map idle and runs features using deterministic approach
         print("⏳ Waiting for view to go idle after jumpTo...")
@@ -128,8 +124,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Activate lasso mode
         print("🎯 Activating lasso selection mode...")
-        lasso_btn = self.find_clickable_element(driver, wait, "#lasso-btn")
-        lasso_btn.click()
+        self.find_by_pattern(driver, wait, "lasso_button", click=True)
         
         # Wait for lasso mode to activate
         WebDriverWait(driver, 5).until(
@@ -236,17 +231,13 @@ class TestBasicLassoSelection(BaseMobileTest):
         new_zoom = max(11, current_zoom - 2)  # Zoom out by 2 levels, minimum zoom 11
         print(f"📏 Current zoom: {current_zoom}, new zoom: {new_zoom}")
         
-        driver.execute_script(f"""
-            // Use jumpTo for instant, deterministic positioning (no animation)
-            map.jumpTo({{
-                center: [{frederick_lon}, {frederick_lat}],
-                zoom: {new_zoom}
-            }});
-        """)
-        
-        # Wait for map to settle at new zoom level
+        # Use jumpTo for instant, deterministic positioning (no animation)
+        # and wait for map to settle at new zoom level
         print("⏳ Waiting for map to settle at new zoom level...")
-        self.wait_for_map_idle_after_move(driver, timeout_ms=6000, verbose=True)
+        self.fly_and_wait_idle(driver, {
+            'center': [frederick_lon, frederick_lat],
+            'zoom': new_zoom
+        }, timeout_ms=6000, verbose=True, method='jumpTo')
         
         # Wait for map idle and runs features at new zoom level
         print("⏳ Waiting for view to go idle after zoom out...")
@@ -276,8 +267,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Reactivate lasso mode (it gets deactivated when panel closes)
         print("🎯 Reactivating lasso selection mode for second test...")
-        lasso_btn_second = self.find_clickable_element(driver, wait, "#lasso-btn")
-        lasso_btn_second.click()
+        self.find_by_pattern(driver, wait, "lasso_button", click=True)
         
         # Wait for lasso mode to activate
         WebDriverWait(driver, 5).until(
@@ -299,7 +289,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         if not lasso_active_check['isActive']:
             print("❌ Lasso mode not properly activated for second test")
             # Try clicking again
-            lasso_btn_second.click()
+            self.find_by_pattern(driver, wait, "lasso_button", click=True)
             
             # Wait for lasso mode to activate after retry
             WebDriverWait(driver, 5).until(
@@ -346,8 +336,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # First, click "deselect all"
         print("   📝 Clicking 'Deselect All' button...")
-        deselect_all_btn = self.find_clickable_element(driver, wait, "#deselect-all")
-        deselect_all_btn.click()
+        self.find_by_pattern(driver, wait, "deselect_all", click=True)
         
         # Wait for all checkboxes to be unchecked
         WebDriverWait(driver, 5).until(
@@ -373,8 +362,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Now select only the first activity
         print("   📝 Selecting first activity only...")
-        first_checkbox = self.find_clickable_element(driver, wait, ".run-checkbox:first-of-type")
-        first_checkbox.click()
+        self.find_clickable_element(driver, wait, ".run-checkbox:first-of-type", click=True)
         
         # Ensure the change event is properly triggered
         driver.execute_script("""
@@ -393,8 +381,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Step 2: Minimize the sidebar
         print("   📝 Minimizing sidebar...")
-        collapse_btn = self.find_clickable_element(driver, wait, "#panel-collapse")
-        collapse_btn.click()
+        self.find_by_pattern(driver, wait, "panel_collapse", click=True)
         
         # Wait for sidebar to collapse
         WebDriverWait(driver, 5).until(
@@ -417,7 +404,11 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Positive test: Verify exactly one activity is visible
         print("   🔍 Positive test: Verifying selected activity is visible...")
-        features_verification = self.verify_features_in_current_viewport(driver)
+        # Viewport features and rendering state in one round trip
+        map_state = self.snapshot(driver, rendering=True, viewport=True)
+        features_verification = map_state['viewport']
+        debug_state = map_state['rendering']
+        print(f"   🔍 Debug: Map loaded: {debug_state['mapLoaded']}, {len(debug_state['layers'])} layers, {len(debug_state['sources'])} sources")
         
         # Also check the map filter is correctly applied
         map_filter_check = driver.execute_script("""
@@ -462,8 +453,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Reopen the sidebar from collapsed state
         print("   📝 Reopening sidebar from collapsed state...")
-        expand_btn = self.find_clickable_element(driver, wait, "#expand-btn")
-        expand_btn.click()
+        self.find_by_pattern(driver, wait, "panel_expand", click=True)
         
         # Wait for sidebar to expand
         WebDriverWait(driver, 5).until(
@@ -481,8 +471,7 @@ class TestBasicLassoSelection(BaseMobileTest):
         
         # Close with 'x' button
         print("   📝 Closing sidebar with 'x' button...")
-        close_btn = self.find_clickable_element(driver, wait, "#panel-close")
-        close_btn.click()
+        self.find_by_pattern(driver, wait, "panel_close", click=True)
         
         # Wait for sidebar to close
         WebDriverWait(driver, 5).until(
@@ -650,12 +639,13 @@ class TestBasicLassoSelection(BaseMobileTest):
         start_time = time.time()
         
         while time.time() - start_time < max_wait:
-            # Check panel state
-            panel_info = self.check_side_panel(driver)
+            # Check panel state, with activity details so success needs no second call
+            panel_info = self.check_side_panel(driver, details=True)
             run_count = panel_info.get('runCount', 0)
             
             if run_count > 0:
                 elapsed = time.time() - start_time
+                self._print_formatted_panel_info(panel_info)
                 return {
                     'panel_opened': True,
                     'run_count': run_count,
@@ -15,7 +15,7 @@ class TestExtrasOnlyLastActivity(BaseMobileTest):
         wait: WebDriverWait = mobile_driver["wait"]
 
         # Wait for app WebView to become available
-        self.wait_for_webview_available(driver, wait, verbose=True)
+        self.wait_for_webview_available(driver, verbose=True)
         self.switch_to_webview(driver)
         self.wait_for_map_load(driver, wait, verbose=True)
 
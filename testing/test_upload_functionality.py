@@ -32,7 +32,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # Phase 1: Setup and App Launch
         print("⏳ Waiting for app WebView to become available...")
-        self.wait_for_webview_available(driver, wait, verbose=True)
+        self.wait_for_webview_available(driver, verbose=True)
         
         print("🔄 Switching to WebView context...")
         self.switch_to_webview(driver)
@@ -131,8 +131,7 @@ class TestUploadFunctionality(BaseMobileTest):
         print("📱 Locating and clicking upload button...")
         
         # Find upload button
-        upload_btn = self.find_clickable_element(driver, wait, "#upload-btn")
-        upload_btn.click()
+        self.find_by_pattern(driver, wait, "upload_button", click=True)
         
         # Use optimized context switching with caching
         print("🔄 Switching to native context for file picker...")
@@ -313,8 +312,8 @@ class TestUploadFunctionality(BaseMobileTest):
             page_source = driver.page_source
             
             # Save to file for analysis
+            # Written next to this module, so the directory always exists
             debug_file = Path(__file__).parent / "debug_upload_file_picker.xml"
-            debug_file.parent.mkdir(exist_ok=True)
             
             with open(debug_file, 'w', encoding='utf-8') as f:
                 f.write(page_source)
@@ -416,16 +415,12 @@ class TestUploadFunctionality(BaseMobileTest):
         # Step 1: Navigate to uploaded activity coordinates (from manual_upload_run.gpx)
         print("📋 Step 1: Navigating to uploaded activity coordinates...")
         upload_center_lat, upload_center_lon = 39.4212, -77.4112  # Center of uploaded GPX route
-        driver.execute_script(f"""
-            map.flyTo({{
-                center: [{upload_center_lon}, {upload_center_lat}],
-                zoom: 13,
-                duration: 1000
-            }});
-        """)
-        
-        # Wait for map to settle after navigation
-        self.wait_for_map_idle_after_move(driver, timeout_ms=8000, verbose=True)
+        # Fly there and wait for map to settle after navigation
+        self.fly_and_wait_idle(driver, {
+            'center': [upload_center_lon, upload_center_lat],
+            'zoom': 13,
+            'duration': 1000
+        }, timeout_ms=8000, verbose=True)
         
         # Step 2: Verify red activity line at specific uploaded coordinates
         print("📋 Step 2: Verifying red line pixels at uploaded GPX coordinates...")
@@ -590,9 +585,10 @@ class TestUploadFunctionality(BaseMobileTest):
         
         return pixel_check
     
-    def verify_features_in_current_viewport(self, driver):
+    def verify_features_in_current_viewport(self, driver, verbose=False):
         """Verify activity features are visible in current viewport (after auto-zoom)"""
         verification = driver.execute_script("""
+            const verbose = arguments[0].verbose;
             const bounds = map.getBounds();
             const zoom = map.getZoom();
             
@@ -609,13 +605,14 @@ class TestUploadFunctionality(BaseMobileTest):
                 zoom: zoom,
                 totalRenderedFeatures: renderedFeatures.length,
                 featuresInViewport: activityFeatures.length,
-                sampleFeature: activityFeatures[0] || null,
+                // The full sample feature is only sent when asked for
+                sampleFeature: verbose ? activityFeatures[0] || null : null,
                 viewportCenter: [
                     (bounds.getWest() + bounds.getEast()) / 2,
                     (bounds.getSouth() + bounds.getNorth()) / 2
                 ]
             };
-        """)
+        """, {'verbose': verbose})
         
         print(f"🗺️ Current viewport verification: {verification['featuresInViewport']} activity features visible")
         print(f"📊 Viewport center: {verification['viewportCenter']}, zoom: {verification['zoom']}")
@@ -727,34 +724,13 @@ class TestUploadFunctionality(BaseMobileTest):
         
         return pixel_check
     
-    def debug_rendering_state(self, driver):
-        """Get complete rendering state for debugging (from rock-solid test)"""
-        return driver.execute_script("""
-            const canvas = map.getCanvas();
-            const gl = canvas.getContext('webgl') || canvas.getContext('webgl2');
-            
-            return {
-                mapLoaded: map.loaded(),
-                mapStyle: !!map.getStyle(),
-                canvasSize: {w: canvas.width, h: canvas.height},
-                webglContext: !!gl,
-                layers: map.getStyle().layers.map(l => ({
-                    id: l.id,
-                    type: l.type,
-                    visible: map.getLayoutProperty(l.id, 'visibility') !== 'none'
-                })),
-                sources: Object.keys(map.getStyle().sources)
-            };
-        """)
-    
     def clear_uploaded_activities(self, driver, wait):
         """Clear uploaded activities from the app using the built-in clear function"""
         print("🧹 Opening extras panel to access clear uploads...")
         
         try:
             # Open extras panel
-            extras_btn = self.find_clickable_element(driver, wait, "#extras-btn")
-            extras_btn.click()
+            self.find_by_pattern(driver, wait, "extras_button", click=True)
             
             # Wait for extras panel to open and load content
             print("⏳ Waiting for extras panel to open...")
@@ -770,7 +746,7 @@ class TestUploadFunctionality(BaseMobileTest):
             
             # Look for clear uploads button
             print("🔍 Looking for clear uploads button...")
-            clear_btn = self.find_clickable_element(driver, wait, "#clear-uploads-btn")
+            clear_btn = self.find_by_pattern(driver, wait, "clear_uploads_button")
             
             # Use JavaScript to bypass the confirmation dialog and call clearUserUploads directly
             print("🗑️ Clearing uploaded activities programmatically...")
@@ -800,8 +776,7 @@ class TestUploadFunctionality(BaseMobileTest):
             
             # Close extras panel
             print("📱 Closing extras panel...")
-            extras_btn = self.find_clickable_element(driver, wait, "#extras-btn")
-            extras_btn.click()
+            self.find_by_pattern(driver, wait, "extras_button", click=True)
             
             # Wait for extras panel to close
             WebDriverWait(driver, 5).until(
@@ -853,15 +828,11 @@ class TestUploadFunctionality(BaseMobileTest):
         zoom_level = 11  # Zoomed out to see all activities
         
         print(f"🗺️ Navigating to Frederick area to encompass all activities: {frederick_lat}, {frederick_lon}")
-        driver.execute_script(f"""
-            map.jumpTo({{
-                center: [{frederick_lon}, {frederick_lat}],
-                zoom: {zoom_level}
-            }});
-        """)
-        
-        # Wait for map to settle after navigation
-        self.wait_for_map_idle_after_move(driver, timeout_ms=8000, verbose=True)
+        # Jump there and wait for map to settle after navigation
+        self.fly_and_wait_idle(driver, {
+            'center': [frederick_lon, frederick_lat],
+            'zoom': zoom_level
+        }, timeout_ms=8000, verbose=True, method='jumpTo')
         
         # Inject map helpers if not already present
         print("📦 Ensuring map test helpers are available...")
@@ -878,8 +849,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # Activate lasso mode
         print("🎯 Activating lasso selection mode...")
-        lasso_btn = self.find_clickable_element(driver, wait, "#lasso-btn")
-        lasso_btn.click()
+        self.find_by_pattern(driver, wait, "lasso_button", click=True)
         
         # Wait for lasso mode to be activated
         lasso_wait = WebDriverWait(driver, 5)
@@ -930,8 +900,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # First, click "deselect all"
         print("   📝 Clicking 'Deselect All' button...")
-        deselect_all_btn = self.find_clickable_element(driver, wait, "#deselect-all")
-        deselect_all_btn.click()
+        self.find_by_pattern(driver, wait, "deselect_all", click=True)
         
         # Wait for all checkboxes to be unchecked
         WebDriverWait(driver, 5).until(
@@ -999,8 +968,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # Step 2: Minimize the sidebar
         print("   📝 Minimizing sidebar...")
-        collapse_btn = self.find_clickable_element(driver, wait, "#panel-collapse")
-        collapse_btn.click()
+        self.find_by_pattern(driver, wait, "panel_collapse", click=True)
         
         # Wait for sidebar to collapse
         collapse_wait = WebDriverWait(driver, 5)
@@ -1071,8 +1039,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # Reopen the sidebar from collapsed state
         print("   📝 Reopening sidebar from collapsed state...")
-        expand_btn = self.find_clickable_element(driver, wait, "#expand-btn")
-        expand_btn.click()
+        self.find_by_pattern(driver, wait, "panel_expand", click=True)
         
         # Wait for sidebar to expand
         WebDriverWait(driver, 5).until(
@@ -1090,8 +1057,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # Close with 'x' button
         print("   📝 Closing sidebar with 'x' button...")
-        close_btn = self.find_clickable_element(driver, wait, "#panel-close")
-        close_btn.click()
+        self.find_by_pattern(driver, wait, "panel_close", click=True)
         
         # Wait for sidebar to close
         WebDriverWait(driver, 5).until(
@@ -1144,8 +1110,7 @@ class TestUploadFunctionality(BaseMobileTest):
         
         # Step 1: Open extras sidebar
         print("📱 Opening extras sidebar...")
-        extras_btn = self.find_clickable_element(driver, wait, "#extras-btn")
-        extras_btn.click()
+        self.find_by_pattern(driver, wait, "extras_button", click=True)
         
         # Wait for extras panel to be fully open
         from selenium.webdriver.support import expected_conditions as EC
@@ -1422,12 +1387,13 @@ class TestUploadFunctionality(BaseMobileTest):
         start_time = time.time()
         
         while time.time() - start_time < max_wait:
-            # Check panel state
-            panel_info = self.check_side_panel(driver)
+            # Check panel state, with activity details so success needs no second call
+            panel_info = self.check_side_panel(driver, details=True)
             run_count = panel_info.get('runCount', 0)
             
             if run_count > 0:
                 elapsed = time.time() - start_time
+                self._print_formatted_panel_info(panel_info)
                 return {
                     'panel_opened': True,
                     'run_count': run_count,